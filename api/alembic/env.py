@@ -10,6 +10,9 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from database.base import Base
 from models.user import User  # Import all models here
+from models.usage import Usage, UsageDaily
+from models.conversation import Conversation, ChatMessage
+from models.session import UserSession
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,116 @@
+"""Response serialization benchmark per endpoint.
+
+Compares the previous path (build the response model by hand, let FastAPI
+re-validate it through ``response_model`` and encode it with the stdlib
+``JSONResponse``) against ``utils.serialization.json_response``, which
+validates once and dumps straight to bytes with a precompiled adapter.
+Only serialization is timed; no database or HTTP round trip.
+
+    python benchmarks/bench_serialization.py --iterations 20000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from uuid import uuid4
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from schemas.auth import Token, UserResponse
+from schemas.chat import ChatResponse, StreamResponse
+from utils.serialization import json_response
+
+USER = SimpleNamespace(
+    id=uuid4(),
+    email="alice@example.com",
+    username="alice",
+    hashed_password="$2b$12$" + "x" * 53,
+    is_active=True,
+    created_at=datetime(2025, 1, 1, 12, 0),
+    last_login=datetime(2025, 1, 2, 8, 30),
+)
+ACCESS = "eyJhbGciOiJIUzI1NiJ9." + "a" * 120 + ".sig"
+
+
+def user_by_hand():
+    return UserResponse(
+        id=USER.id,
+        email=USER.email,
+        username=USER.username,
+        is_active=USER.is_active,
+        created_at=USER.created_at,
+        last_login=USER.last_login,
+    )
+
+
+def token():
+    return Token(access_token=ACCESS, refresh_token=ACCESS, expires_in=30 * 60)
+
+
+def chat():
+    return ChatResponse(message="Chat response for user alice", user_id=USER.id, conversation_id=USER.id, messages_received=3)
+
+
+def stream():
+    return StreamResponse(message="Stream response for user alice", user_id=USER.id, conversation_id=USER.id, prompt="hello " * 20)
+
+
+# endpoint -> (response model, build for the old path, build for the new path)
+ENDPOINTS = {
+    "POST /auth/register": (UserResponse, user_by_hand, lambda: UserResponse.model_validate(USER)),
+    "GET /auth/me": (UserResponse, user_by_hand, lambda: UserResponse.model_validate(USER)),
+    "POST /auth/login": (Token, token, token),
+    "POST /chat/": (ChatResponse, chat, chat),
+    "POST /chat/stream": (StreamResponse, stream, stream),
+}
+
+
+def run_sync(coro):
+    """Run a coroutine that never suspends without event loop overhead"""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def time_per_call(fn, iterations: int) -> float:
+    for _ in range(min(1000, iterations)):
+        fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<20} {'response_model':>15} {'json_response':>14} {'speedup':>8}")
+    for name, (model, build_old, build_new) in ENDPOINTS.items():
+        field = create_model_field(name="Response_" + model.__name__, type_=model, mode="serialization")
+
+        def old():
+            content = run_sync(serialize_response(field=field, response_content=build_old()))
+            return JSONResponse(content).body
+
+        def new():
+            return json_response(build_new()).body
+
+        assert json.loads(old()) == json.loads(new()), name
+        old_us = time_per_call(old, args.iterations)
+        new_us = time_per_call(new, args.iterations)
+        print(f"{name:<20} {old_us:>13.1f}us {new_us:>12.1f}us {old_us / new_us:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
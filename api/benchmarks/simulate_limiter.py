@@ -0,0 +1,201 @@
+"""Offline simulation of the adaptive concurrency limiter.
+
+Replays per-route latency distributions against a simulated worker and
+compares running without a limiter to running with ``ConcurrencyLimiter``
+through a load spike. Use it to tune ``CONCURRENCY_*`` settings before
+changing them in production.
+
+The worker is modelled as processor sharing: up to ``--capacity`` requests
+run at full speed, and beyond that every in-flight request slows down
+proportionally (event loop, DB pool and CPU all saturate). A request's
+work is its latency drawn from the recorded distribution. Clients give up
+after ``--timeout``, but the worker still finishes the request, as uvicorn
+does.
+
+Latencies come from the JSON access log written by
+``RequestLoggingMiddleware`` (``ttfb_ms``, falling back to ``duration_ms``),
+so record with ``LOG_SAMPLE_DEFAULT=1``. The log should come from a
+lightly loaded period, because recorded latencies are treated as no-load
+work. Without ``--log`` a built-in synthetic mix is used.
+
+    python benchmarks/simulate_limiter.py --rps 300 --spike 3 --capacity 16
+    python benchmarks/simulate_limiter.py --log access.log --tolerance 1.5 --backoff 0.8
+"""
+import argparse
+import heapq
+import json
+import math
+import os
+import random
+import sys
+from collections import defaultdict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from middleware.concurrency_limit import DEFAULT_PRIORITIES, ConcurrencyLimitMiddleware, parse_priorities
+from utils.limiter import AIMDLimit, ConcurrencyLimiter, Priority
+
+# path -> (share of traffic, median seconds, lognormal sigma)
+SYNTHETIC_ROUTES = {
+    "/health": (0.02, 0.001, 0.3),
+    "/api/v1/auth/refresh": (0.08, 0.008, 0.4),
+    "/api/v1/auth/me": (0.30, 0.010, 0.5),
+    "/api/v1/search": (0.20, 0.040, 0.6),
+    "/api/v1/chat/generate": (0.40, 0.025, 0.5),
+}
+
+
+def synthetic_routes(rng: random.Random):
+    routes = []
+    for path, (weight, median, sigma) in SYNTHETIC_ROUTES.items():
+        mu = math.log(median)
+        routes.append((path, weight, lambda mu=mu, sigma=sigma: rng.lognormvariate(mu, sigma)))
+    return routes
+
+
+def recorded_routes(path: str, rng: random.Random):
+    samples = defaultdict(list)
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("logger") != "api.request" or entry.get("status", 500) >= 500:
+                continue
+            latency = entry.get("ttfb_ms", entry.get("duration_ms"))
+            if latency is not None:
+                samples[entry["path"]].append(latency / 1000)
+    if not samples:
+        raise SystemExit(f"no api.request records with latencies in {path}")
+    return [(route, len(values), lambda values=values: rng.choice(values)) for route, values in samples.items()]
+
+
+def generate_arrivals(routes, classify, rps: float, spike: float, duration: float, rng: random.Random):
+    """Poisson arrivals at ``rps``, multiplied by ``spike`` during the middle third"""
+    paths = [route for route, _, _ in routes]
+    weights = [weight for _, weight, _ in routes]
+    samplers = {route: sampler for route, _, sampler in routes}
+    arrivals = []
+    now = 0.0
+    while True:
+        in_spike = duration / 3 <= now < 2 * duration / 3
+        now += rng.expovariate(rps * (spike if in_spike else 1))
+        if now >= duration:
+            return arrivals
+        path = rng.choices(paths, weights)[0]
+        arrivals.append((now, path, classify(path), samplers[path]()))
+
+
+def simulate(arrivals, capacity: int, timeout: float, limiter=None):
+    results = defaultdict(lambda: {"offered": 0, "shed": 0, "ok": 0, "timeout": 0, "latencies": []})
+    limits = []
+    # Processor sharing via virtual time: every in-flight request receives
+    # the same service rate, so each finishes when the virtual clock
+    # reaches its admission time plus its work.
+    virtual = now = 0.0
+    running = []
+    seq = 0
+
+    def advance(to: float):
+        nonlocal virtual, now
+        while running:
+            rate = min(1.0, capacity / len(running))
+            finish, _, arrival, path, priority = running[0]
+            done_at = now + (finish - virtual) / rate
+            if done_at > to:
+                virtual += (to - now) * rate
+                break
+            heapq.heappop(running)
+            virtual, now = finish, done_at
+            latency = now - arrival
+            stats = results[priority]
+            stats["latencies"].append(latency)
+            stats["ok" if latency <= timeout else "timeout"] += 1
+            if limiter is not None:
+                limiter.release(path, arrival, now, dropped=latency > timeout)
+        now = to
+
+    for arrival, path, priority, work in arrivals:
+        advance(arrival)
+        results[priority]["offered"] += 1
+        if limiter is not None:
+            limits.append(limiter.limit.limit)
+            if not limiter.try_acquire(priority):
+                results[priority]["shed"] += 1
+                continue
+        seq += 1
+        heapq.heappush(running, (virtual + work, seq, arrival, path, priority))
+    advance(float("inf"))
+    return results, limits
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def report(name: str, results, duration: float, limits=None):
+    print(f"\n{name}")
+    print(f"  {'class':<9} {'offered':>8} {'shed':>7} {'ok':>7} {'timeout':>8} {'p50 ms':>8} {'p99 ms':>9}")
+    total_ok = 0
+    for priority in Priority:
+        stats = results.get(priority)
+        if not stats:
+            continue
+        total_ok += stats["ok"]
+        print(
+            f"  {priority.name.lower():<9} {stats['offered']:>8} {stats['shed']:>7} {stats['ok']:>7} "
+            f"{stats['timeout']:>8} {percentile(stats['latencies'], 0.5) * 1000:>8.1f} "
+            f"{percentile(stats['latencies'], 0.99) * 1000:>9.1f}"
+        )
+    line = f"  goodput {total_ok / duration:.0f} req/s"
+    if limits:
+        line += f", limit min/mean/max {min(limits)}/{sum(limits) / len(limits):.0f}/{max(limits)}"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--log", help="JSON access log to replay latencies from")
+    parser.add_argument("--rps", type=float, default=300)
+    parser.add_argument("--spike", type=float, default=3.0, help="load multiplier for the middle third")
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--capacity", type=int, default=16, help="requests the worker serves at full speed")
+    parser.add_argument("--timeout", type=float, default=2.0, help="client timeout in seconds")
+    parser.add_argument("--priorities", default=os.getenv("CONCURRENCY_PRIORITIES", DEFAULT_PRIORITIES))
+    parser.add_argument("--initial", type=int, default=64)
+    parser.add_argument("--min-limit", type=int, default=8)
+    parser.add_argument("--max-limit", type=int, default=1000)
+    parser.add_argument("--backoff", type=float, default=0.9)
+    parser.add_argument("--tolerance", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    routes = recorded_routes(args.log, rng) if args.log else synthetic_routes(rng)
+    classifier = ConcurrencyLimitMiddleware(None, priorities=parse_priorities(args.priorities))
+    arrivals = generate_arrivals(routes, classifier.priority, args.rps, args.spike, args.duration, rng)
+    print(
+        f"{len(arrivals)} requests over {args.duration:.0f}s, {args.rps:.0f} req/s with a {args.spike}x spike, "
+        f"capacity {args.capacity}, client timeout {args.timeout}s"
+    )
+
+    results, _ = simulate(arrivals, args.capacity, args.timeout)
+    report("no limiter", results, args.duration)
+
+    limiter = ConcurrencyLimiter(AIMDLimit(
+        initial=args.initial,
+        min_limit=args.min_limit,
+        max_limit=args.max_limit,
+        backoff=args.backoff,
+        tolerance=args.tolerance,
+    ))
+    results, limits = simulate(arrivals, args.capacity, args.timeout, limiter)
+    report("adaptive limiter", results, args.duration, limits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Idle WebSocket load test for /api/v1/chat/ws.
+
+Opens ``--connections`` authenticated sockets against a running server,
+answers heartbeats, and reports the server's resident memory per socket
+(read from /proc, so run it on the same host as the server).
+
+    uvicorn main:app --port 8080 &
+    python benchmarks/ws_load.py --connections 10000 --pid $!
+
+Raise the open-file limit first (``ulimit -n 65536``) for 10k sockets.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+
+import websockets
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.jwt import create_access_token
+
+
+def rss_bytes(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+async def hold(url: str, ready: asyncio.Event, stop: asyncio.Event, counters: dict):
+    try:
+        async with websockets.connect(url, open_timeout=60, ping_interval=None) as ws:
+            frame = json.loads(await ws.recv())
+            if frame["type"] != "ready":
+                raise RuntimeError(f"unexpected first frame {frame}")
+            counters["open"] += 1
+            if counters["open"] == counters["target"]:
+                ready.set()
+            while not stop.is_set():
+                try:
+                    frame = json.loads(await asyncio.wait_for(ws.recv(), 1.0))
+                except asyncio.TimeoutError:
+                    continue
+                if frame["type"] == "ping":
+                    await ws.send(json.dumps({"type": "pong"}))
+    except Exception as e:
+        counters["failed"] += 1
+        counters["last_error"] = repr(e)
+        if counters["open"] + counters["failed"] == counters["target"]:
+            ready.set()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://127.0.0.1:8080/api/v1/chat/ws")
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--hold", type=float, default=30.0, help="seconds to keep sockets open")
+    parser.add_argument("--pid", type=int, default=None, help="server process id for RSS sampling")
+    args = parser.parse_args()
+
+    token = create_access_token(data={"sub": str(uuid.uuid4()), "email": "load@example.com"})
+    url = f"{args.url}?token={token}"
+
+    baseline = rss_bytes(args.pid) if args.pid else 0
+    counters = {"open": 0, "failed": 0, "target": args.connections, "last_error": None}
+    ready, stop = asyncio.Event(), asyncio.Event()
+
+    start = time.perf_counter()
+    tasks = []
+    for offset in range(0, args.connections, args.batch):
+        for _ in range(min(args.batch, args.connections - offset)):
+            tasks.append(asyncio.create_task(hold(url, ready, stop, counters)))
+        await asyncio.sleep(0.2)
+    await ready.wait()
+    connect_time = time.perf_counter() - start
+
+    await asyncio.sleep(args.hold)
+    loaded = rss_bytes(args.pid) if args.pid else 0
+
+    print(f"connections open={counters['open']} failed={counters['failed']} connect_time={connect_time:.1f}s")
+    if counters["last_error"]:
+        print(f"last error: {counters['last_error']}")
+    if args.pid and counters["open"]:
+        delta = loaded - baseline
+        print(
+            f"server rss baseline={baseline / 2**20:.1f}MiB loaded={loaded / 2**20:.1f}MiB "
+            f"per_socket={delta / counters['open'] / 1024:.1f}KiB "
+            f"per_10k={delta / counters['open'] * 10_000 / 2**20:.1f}MiB"
+        )
+
+    stop.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
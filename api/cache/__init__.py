@@ -0,0 +1,18 @@
+import os
+
+from .backends import CacheBackend, FakeBackend, RedisBackend
+from .local import LocalCache
+from .orm import OrmCodec
+from .tiered import CacheManager, CacheNamespace
+
+# Shared L2 for all workers; without it every worker caches on its own
+# and invalidations only reach the worker that made the change
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+# Global instance; namespaces are registered by the modules that use them
+cache_manager = CacheManager(RedisBackend(CACHE_REDIS_URL) if CACHE_REDIS_URL else None)
+
+__all__ = [
+    "CacheBackend", "FakeBackend", "RedisBackend", "LocalCache", "OrmCodec",
+    "CacheManager", "CacheNamespace", "cache_manager",
+]
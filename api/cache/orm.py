@@ -0,0 +1,57 @@
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Type
+from uuid import UUID
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+_PARSERS: Dict[type, Callable[[str], Any]] = {
+    UUID: UUID,
+    datetime: datetime.fromisoformat,
+    date: date.fromisoformat,
+}
+
+
+class OrmCodec:
+    """Caches ORM rows as plain column snapshots and restores them into a session.
+
+    ``restore`` attaches the snapshot to the caller's session with
+    ``merge(load=False)``, so a hit costs no query and every request still
+    gets its own instance. Columns listed in ``exclude`` (e.g. password
+    hashes) stay out of the cache and load lazily if something reads them.
+    """
+
+    def __init__(self, model: Type, exclude: Iterable[str] = ()):
+        self.model = model
+        self.columns = {}
+        for attr in inspect(model).column_attrs:
+            if attr.key in exclude:
+                continue
+            try:
+                python_type = attr.columns[0].type.python_type
+            except NotImplementedError:
+                python_type = None
+            self.columns[attr.key] = _PARSERS.get(python_type)
+
+    def snapshot(self, instance) -> Optional[dict]:
+        if instance is None:
+            return None
+        return {key: getattr(instance, key) for key in self.columns}
+
+    def restore(self, db: Session, data: Optional[dict]):
+        if data is None:
+            return None
+        instance = self.model(**data)
+        make_transient_to_detached(instance)
+        return db.merge(instance, load=False)
+
+    def dumps(self, data: dict) -> bytes:
+        return json.dumps(data, default=str).encode()
+
+    def loads(self, raw: bytes) -> dict:
+        data = json.loads(raw)
+        for key, parse in self.columns.items():
+            if parse is not None and data.get(key) is not None:
+                data[key] = parse(data[key])
+        return data
@@ -0,0 +1,276 @@
+import json
+import logging
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Optional
+from uuid import uuid4
+
+from .backends import CacheBackend
+from .local import MISSING, LocalCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+
+def json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode()
+
+
+def json_loads(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+class _Pending:
+    """A load in progress that other callers for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CacheNamespace:
+    """One logical cache: an L1 in this process, optionally backed by the shared L2.
+
+    ``get_or_load`` checks L1, then L2, then calls the loader. Concurrent
+    misses for the same key wait for the first caller's load instead of
+    all reaching the database. Loader results of ``None`` are not cached.
+
+    Cached values are shared between callers and must be treated as
+    read-only plain data (never ORM instances; see ``cache.orm``).
+    """
+
+    def __init__(
+        self,
+        manager: "CacheManager",
+        name: str,
+        ttl: float,
+        local_ttl: float,
+        max_size: int,
+        shared: bool,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+        coalesce_timeout: float = 5.0,
+    ):
+        self.manager = manager
+        self.name = name
+        self.ttl = ttl
+        self.shared = shared
+        self.dumps = dumps
+        self.loads = loads
+        self.coalesce_timeout = coalesce_timeout
+        self.local = LocalCache(max_size=max_size, ttl=local_ttl)
+        self.counters: Counter = Counter()
+        self._inflight: Dict[str, _Pending] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; a load that raced one is returned but not stored
+        self._epoch = 0
+
+    @property
+    def backend(self) -> Optional[CacheBackend]:
+        return self.manager.backend if self.shared else None
+
+    def _l2_key(self, key: str) -> str:
+        return f"cache:{self.name}:{key}"
+
+    def get_or_load(self, key, loader: Callable[[], Any]) -> Any:
+        key = str(key)
+        value = self.local.get(key)
+        if value is not MISSING:
+            self.counters["l1_hits"] += 1
+            return value
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._inflight[key] = _Pending()
+
+        if not leader:
+            if not pending.done.wait(self.coalesce_timeout):
+                # The first load is stuck; don't queue behind it indefinitely
+                self.counters["misses"] += 1
+                return loader()
+            self.counters["coalesced"] += 1
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+
+        try:
+            pending.value = self._load(key, loader)
+            return pending.value
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.done.set()
+
+    def _load(self, key: str, loader: Callable[[], Any]) -> Any:
+        epoch = self._epoch
+        backend = self.backend
+        if backend is not None:
+            try:
+                raw = backend.get(self._l2_key(key))
+            except Exception as e:
+                self.counters["l2_errors"] += 1
+                logger.warning("Cache %s L2 read failed: %s", self.name, e)
+                raw = None
+            if raw is not None:
+                self.counters["l2_hits"] += 1
+                value = self.loads(raw)
+                if epoch == self._epoch:
+                    self.local.set(key, value)
+                return value
+
+        self.counters["misses"] += 1
+        value = loader()
+        if value is not None and epoch == self._epoch:
+            self.local.set(key, value)
+            self._write_l2(key, value)
+        return value
+
+    def _write_l2(self, key: str, value: Any) -> None:
+        backend = self.backend
+        if backend is None:
+            return
+        try:
+            backend.set(self._l2_key(key), self.dumps(value), self.ttl)
+        except Exception as e:
+            self.counters["l2_errors"] += 1
+            logger.warning("Cache %s L2 write failed: %s", self.name, e)
+
+    def set(self, key, value: Any) -> None:
+        """Store a fresh value after a write and make other workers drop their copy"""
+        key = str(key)
+        self._epoch += 1
+        self.local.set(key, value)
+        self._write_l2(key, value)
+        self.manager.publish(self.name, key)
+
+    def invalidate(self, key) -> None:
+        """Drop ``key`` here, in the L2 and (via pub/sub) in every other worker's L1"""
+        key = str(key)
+        self._epoch += 1
+        self.local.delete(key)
+        self.counters["invalidations"] += 1
+        backend = self.backend
+        if backend is not None:
+            try:
+                backend.delete(self._l2_key(key))
+            except Exception as e:
+                self.counters["l2_errors"] += 1
+                logger.warning("Cache %s L2 delete failed: %s", self.name, e)
+        self.manager.publish(self.name, key)
+
+    def drop_local(self, key: str) -> None:
+        """Handle an invalidation published by another worker"""
+        self._epoch += 1
+        self.local.delete(key)
+        self.counters["remote_invalidations"] += 1
+
+    def stats(self) -> dict:
+        counters = self.counters
+        served = counters["l1_hits"] + counters["l2_hits"] + counters["coalesced"]
+        lookups = served + counters["misses"]
+        return {
+            "namespace": self.name,
+            "size": len(self.local),
+            "l1_hits": counters["l1_hits"],
+            "l2_hits": counters["l2_hits"],
+            "coalesced": counters["coalesced"],
+            "misses": counters["misses"],
+            "hit_ratio": round(served / lookups, 4) if lookups else 0.0,
+            "evictions": self.local.evictions,
+            "invalidations": counters["invalidations"],
+            "remote_invalidations": counters["remote_invalidations"],
+            "l2_errors": counters["l2_errors"],
+        }
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self.local.clear()
+        self.counters.clear()
+        self.local.evictions = 0
+
+
+class CacheManager:
+    """Owns the cache namespaces of this worker and their shared L2 backend.
+
+    Invalidations are published as ``<origin>:<namespace>:<key>`` on one
+    channel; each worker drops the key from its L1 unless it sent the
+    message itself.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self.backend = backend
+        self.origin = uuid4().hex
+        self.namespaces: Dict[str, CacheNamespace] = {}
+        self._subscribed = False
+
+    def namespace(
+        self,
+        name: str,
+        ttl: float = 60.0,
+        local_ttl: Optional[float] = None,
+        max_size: int = 10000,
+        shared: bool = True,
+        dumps: Callable[[Any], bytes] = json_dumps,
+        loads: Callable[[bytes], Any] = json_loads,
+    ) -> CacheNamespace:
+        """Register (or return the already registered) namespace ``name``.
+
+        ``local_ttl`` bounds how stale the L1 can get if an invalidation
+        message is lost; it defaults to ``ttl``. Namespaces with
+        ``shared=False`` never touch the L2. L2 values default to JSON; never
+        use pickle here, since anything that can write to Redis could then
+        run code in the workers.
+        """
+        if ":" in name:
+            raise ValueError("cache namespace names cannot contain ':'")
+        existing = self.namespaces.get(name)
+        if existing is not None:
+            return existing
+        namespace = CacheNamespace(
+            self, name, ttl, ttl if local_ttl is None else local_ttl, max_size, shared, dumps, loads
+        )
+        self.namespaces[name] = namespace
+        return namespace
+
+    def start(self) -> None:
+        """Start listening for invalidations from other workers"""
+        if self.backend is not None and not self._subscribed:
+            self.backend.subscribe(INVALIDATION_CHANNEL, self._on_message)
+            self._subscribed = True
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
+        self._subscribed = False
+
+    def publish(self, namespace: str, key: str) -> None:
+        if self.backend is None or not self.namespaces[namespace].shared:
+            return
+        try:
+            self.backend.publish(INVALIDATION_CHANNEL, f"{self.origin}:{namespace}:{key}")
+        except Exception as e:
+            logger.warning("Cache invalidation publish failed for %s: %s", namespace, e)
+
+    def _on_message(self, message: str) -> None:
+        origin, _, rest = message.partition(":")
+        name, _, key = rest.partition(":")
+        if origin == self.origin:
+            return
+        namespace = self.namespaces.get(name)
+        if namespace is not None:
+            namespace.drop_local(key)
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: namespace.stats() for name, namespace in self.namespaces.items()}
+
+    def clear(self) -> None:
+        """Empty every L1 and reset counters (tests)"""
+        for namespace in self.namespaces.values():
+            namespace.clear()
@@ -1,3 +1,9 @@
 from .auth import AuthController
+from .usage import UsageMeter
+from .search import SearchController
+from .conversation import ConversationController
+from .websocket import ChatConnection
+from .session import SessionController
+from .provisioning import ProvisioningController
 
-__all__ = ["AuthController"]
\ No newline at end of file
+__all__ = ["AuthController", "UsageMeter", "SearchController", "ConversationController", "ChatConnection", "SessionController", "ProvisioningController"]
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 from uuid import UUID
@@ -8,12 +9,22 @@ from sqlalchemy.orm import Session
 from models.user import User
 from schemas.auth import UserCreate, UserLogin, UserResponse, Token
 from utils.jwt import create_access_token, create_refresh_token
+from controllers.session import session_controller
 from database import get_db
+from cache import OrmCodec, cache_manager
+
+# bcrypt work factor; deliberately not configurable (the test suite swaps in its own context)
+BCRYPT_ROUNDS = 12
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+# Users by id, without the password hash; invalidated whenever a user row is written
+user_codec = OrmCodec(User, exclude=("hashed_password",))
+user_cache = cache_manager.namespace("users", ttl=USER_CACHE_TTL, dumps=user_codec.dumps, loads=user_codec.loads)
 
 
 class AuthController:
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
         self.refresh_tokens: Dict[str, UUID] = {}  # Store refresh tokens (Redis in production)
     
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
@@ -26,7 +37,10 @@ class AuthController:
         return db.query(User).filter(User.email == email).first()
     
     def get_user_by_id(self, db: Session, user_id: UUID) -> Optional[User]:
-        return db.query(User).filter(User.id == user_id).first()
+        data = user_cache.get_or_load(
+            user_id, lambda: user_codec.snapshot(db.query(User).filter(User.id == user_id).first())
+        )
+        return user_codec.restore(db, data)
     
     def create_user(self, db: Session, user_data: UserCreate) -> UserResponse:
         if self.get_user_by_email(db, user_data.email):
@@ -46,14 +60,7 @@ class AuthController:
         db.commit()
         db.refresh(user)
         
-        return UserResponse(
-            id=user.id,
-            email=user.email,
-            username=user.username,
-            is_active=user.is_active,
-            created_at=user.created_at,
-            last_login=user.last_login
-        )
+        return UserResponse.model_validate(user)
     
     def authenticate_user(self, db: Session, email: str, password: str) -> Optional[User]:
         user = self.get_user_by_email(db, email)
@@ -63,7 +70,26 @@ class AuthController:
             return None
         return user
     
-    def login_user(self, db: Session, login_data: UserLogin) -> Token:
+    def _issue_tokens(self, user: User, session_id: UUID) -> Token:
+        access_token = create_access_token(data={"sub": str(user.id), "email": user.email, "sid": str(session_id)})
+        refresh_token = create_refresh_token(data={"sub": str(user.id), "sid": str(session_id)})
+
+        # Store refresh token
+        self.refresh_tokens[refresh_token] = user.id
+
+        return Token(
+            access_token=access_token,
+            refresh_token=refresh_token,
+            expires_in=30 * 60  # 30 minutes
+        )
+
+    def login_user(
+        self,
+        db: Session,
+        login_data: UserLogin,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None,
+    ) -> Token:
         user = self.authenticate_user(db, login_data.email, login_data.password)
         if not user:
             raise HTTPException(
@@ -72,23 +98,20 @@ class AuthController:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Update last login
+        # Update last login and open a session for the new tokens
         user.last_login = datetime.utcnow()
+        session = session_controller.create_session(db, user.id, user_agent, ip_address)
         db.commit()
-        
-        access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
-        refresh_token = create_refresh_token(data={"sub": str(user.id)})
-        
-        # Store refresh token
-        self.refresh_tokens[refresh_token] = user.id
-        
-        return Token(
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=30 * 60  # 30 minutes
-        )
+        user_cache.invalidate(user.id)
+
+        return self._issue_tokens(user, session.id)
     
-    def refresh_access_token(self, db: Session, refresh_token: str) -> Token:
+    def revoke_refresh_tokens(self, user_id: UUID) -> None:
+        for token, owner in list(self.refresh_tokens.items()):
+            if owner == user_id:
+                del self.refresh_tokens[token]
+
+    def refresh_access_token(self, db: Session, refresh_token: str, session_id: Optional[UUID] = None) -> Token:
         if refresh_token not in self.refresh_tokens:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -106,19 +129,15 @@ class AuthController:
         
         # Remove old refresh token
         del self.refresh_tokens[refresh_token]
-        
-        # Create new tokens
-        access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
-        new_refresh_token = create_refresh_token(data={"sub": str(user.id)})
-        
-        # Store new refresh token
-        self.refresh_tokens[new_refresh_token] = user.id
-        
-        return Token(
-            access_token=access_token,
-            refresh_token=new_refresh_token,
-            expires_in=30 * 60  # 30 minutes
-        )
+
+        # Tokens issued before sessions existed get a session on first refresh
+        if session_id is None:
+            session_id = session_controller.create_session(db, user.id).id
+        else:
+            session_controller.extend_session(db, session_id)
+        db.commit()
+
+        return self._issue_tokens(user, session_id)
 
 
 # Global instance for dependency injection
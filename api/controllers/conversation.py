@@ -0,0 +1,82 @@
+import os
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from models.conversation import Conversation, ChatMessage
+from controllers.search import search_controller
+from cache import OrmCodec, cache_manager
+
+CONVERSATION_CACHE_TTL = float(os.getenv("CONVERSATION_CACHE_TTL", "300"))
+
+# Conversation metadata by id; refreshed in place after each turn
+conversation_codec = OrmCodec(Conversation)
+conversation_cache = cache_manager.namespace(
+    "conversations", ttl=CONVERSATION_CACHE_TTL, dumps=conversation_codec.dumps, loads=conversation_codec.loads
+)
+
+
+class ConversationController:
+    def get_conversation(self, db: Session, user_id: UUID, conversation_id: UUID) -> Optional[Conversation]:
+        data = conversation_cache.get_or_load(
+            conversation_id,
+            lambda: conversation_codec.snapshot(db.query(Conversation).filter(Conversation.id == conversation_id).first()),
+        )
+        # Cached by id alone, so ownership is checked on every hit
+        if data is None or data["user_id"] != user_id:
+            return None
+        return conversation_codec.restore(db, data)
+
+    def get_or_create_conversation(
+        self,
+        db: Session,
+        user_id: UUID,
+        conversation_id: Optional[UUID] = None,
+        title: Optional[str] = None,
+    ) -> Conversation:
+        if conversation_id is not None:
+            conversation = self.get_conversation(db, user_id, conversation_id)
+            if not conversation:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Conversation not found"
+                )
+            return conversation
+
+        conversation = Conversation(user_id=user_id, title=title[:200] if title else None)
+        db.add(conversation)
+        db.flush()
+        return conversation
+
+    def add_turn(
+        self,
+        db: Session,
+        conversation: Conversation,
+        user_content: str,
+        assistant_content: str,
+    ) -> List[ChatMessage]:
+        """Store a user message and its reply, then add both to the search index"""
+        messages = [
+            ChatMessage(
+                conversation_id=conversation.id,
+                user_id=conversation.user_id,
+                role=role,
+                content=content,
+            )
+            for role, content in (("user", user_content), ("assistant", assistant_content))
+        ]
+        conversation.updated_at = datetime.utcnow()
+        db.add_all(messages)
+        # Taken before the commit expires the instance, which would cost a reload
+        snapshot = conversation_codec.snapshot(conversation)
+        db.commit()
+        conversation_cache.set(conversation.id, snapshot)
+
+        search_controller.index_messages(messages)
+        return messages
+
+
+# Global instance for dependency injection
+conversation_controller = ConversationController()
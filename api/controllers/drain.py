@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException, status
+
+# Seconds active streams get to finish after SIGTERM before they are cancelled
+DRAIN_TIMEOUT = float(os.getenv("DRAIN_TIMEOUT", "30"))
+
+logger = logging.getLogger(__name__)
+
+
+class DrainController:
+    """Graceful shutdown for long-lived streams.
+
+    On SIGTERM the worker first enters drain mode: ``/readyz`` turns 503 so
+    the load balancer stops routing to it, new streams are refused, and
+    active streams get up to ``timeout`` seconds to finish. Only then is the
+    signal passed on to uvicorn, which closes the listeners and runs the
+    shutdown handlers. A second SIGTERM skips the wait.
+    """
+
+    def __init__(self, timeout: float = DRAIN_TIMEOUT):
+        self.timeout = timeout
+        self.draining = False
+        self.deadline: Optional[float] = None
+        self._active: Set[asyncio.Task] = set()
+        self._changed: Optional[asyncio.Event] = None
+        self._drain_task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> int:
+        return len(self._active)
+
+    @contextmanager
+    def track(self):
+        """Count the current task as an active stream until the block exits"""
+        task = asyncio.current_task()
+        self._active.add(task)
+        try:
+            yield
+        finally:
+            self._active.discard(task)
+            if self._changed is not None:
+                self._changed.set()
+
+    def check_accepting(self) -> None:
+        if self.draining:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is restarting, please retry shortly.",
+                headers={"Retry-After": "2"},
+            )
+
+    def status(self) -> Dict[str, object]:
+        if not self.draining:
+            return {"status": "ready", "active_streams": self.active}
+        return {
+            "status": "draining",
+            "active_streams": self.active,
+            "deadline_in": round(max(0.0, self.deadline - time.monotonic()), 1),
+        }
+
+    async def drain(self) -> int:
+        """Stop taking streams and wait for active ones; returns how many were cancelled"""
+        if not self.draining:
+            self.draining = True
+            self.deadline = time.monotonic() + self.timeout
+            logger.info("Draining %d active streams (timeout %ss)", self.active, self.timeout)
+
+        self._changed = asyncio.Event()
+        while self._active:
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=min(remaining, 1.0))
+            except asyncio.TimeoutError:
+                pass
+            logger.info("Drain progress: %d active streams", self.active)
+
+        leftover = list(self._active)
+        for task in leftover:
+            task.cancel()
+        if leftover:
+            logger.warning("Drain deadline passed, cancelled %d streams", len(leftover))
+        else:
+            logger.info("Drain complete")
+        return len(leftover)
+
+    def install_signal_handler(self) -> None:
+        """Put drain mode in front of the server's SIGTERM handling.
+
+        Must be called from the main thread with the event loop running
+        (i.e. from a startup handler under uvicorn); does nothing otherwise.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        previous = signal.getsignal(signal.SIGTERM)
+        if not callable(previous):
+            return
+
+        def handle_sigterm(signum, frame):
+            if self.draining:
+                previous(signum, frame)
+                return
+
+            async def drain_then_exit():
+                try:
+                    await self.drain()
+                finally:
+                    previous(signum, frame)
+
+            def schedule():
+                self._drain_task = loop.create_task(drain_then_exit())
+
+            loop.call_soon_threadsafe(schedule)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+    def reset(self) -> None:
+        self.draining = False
+        self.deadline = None
+        self._changed = None
+
+
+# Global instance shared by the streaming transports and main.py
+drain_controller = DrainController()
@@ -0,0 +1,275 @@
+import asyncio
+import csv
+import io
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.user import User
+from schemas.admin import ImportResult, ImportRowError
+from schemas.auth import UserCreate
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", "0")) or os.cpu_count() or 1
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Longest accepted import line; a user record is a few hundred bytes
+MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(64 * 1024)))
+# Per-row errors returned in the response; the failed count is always exact
+MAX_REPORTED_ERRORS = 1000
+
+IMPORT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json": "ndjson",
+    "text/csv": "csv",
+}
+EXPORT_COLUMNS = ("id", "email", "username", "is_active", "created_at", "last_login")
+
+
+def _hash_passwords(passwords: List[str]) -> List[str]:
+    """Runs in a worker process"""
+    from controllers.auth import auth_controller
+
+    return [auth_controller.get_password_hash(password) for password in passwords]
+
+
+def _decode_line(line: bytes, max_line_bytes: int):
+    if len(line) > max_line_bytes:
+        return ValueError(f"Line longer than {max_line_bytes} bytes")
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return ValueError("Invalid UTF-8")
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES) -> AsyncIterator[object]:
+    """Split a byte stream into lines.
+
+    A line that isn't UTF-8 or is longer than ``max_line_bytes`` is yielded
+    as a ``ValueError``; the rest of an over-long line is discarded as it
+    arrives instead of being buffered.
+    """
+    buffer = b""
+    skipping = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if skipping:
+                # the tail of a line already reported as too long
+                skipping = False
+                continue
+            yield _decode_line(line, max_line_bytes)
+        if len(buffer) > max_line_bytes:
+            if not skipping:
+                yield ValueError(f"Line longer than {max_line_bytes} bytes")
+                skipping = True
+            buffer = b""
+    if buffer and not skipping:
+        yield _decode_line(buffer, max_line_bytes)
+
+
+async def iter_rows(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Tuple[int, object]]:
+    """Yield ``(row_number, row)`` from an NDJSON or CSV body as it arrives.
+
+    A row that can't be parsed is yielded as the ``ValueError`` describing
+    why, so the caller can report it and carry on. CSV needs a header line
+    and one record per line.
+    """
+    header: Optional[List[str]] = None
+    row_number = 0
+    async for line in _iter_lines(chunks):
+        if isinstance(line, ValueError):
+            if fmt == "csv" and header is None:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail=f"Invalid CSV header: {line}"
+                )
+            row_number += 1
+            yield row_number, line
+            continue
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            fields = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip().lower() for name in fields]
+                continue
+            row_number += 1
+            if len(fields) != len(header):
+                yield row_number, ValueError(f"Expected {len(header)} columns, got {len(fields)}")
+            else:
+                yield row_number, dict(zip(header, fields))
+        else:
+            row_number += 1
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield row_number, ValueError("Invalid JSON")
+                continue
+            yield row_number, row if isinstance(row, dict) else ValueError("Expected a JSON object")
+
+
+class ProvisioningController:
+    """Bulk user import and streaming export for admins.
+
+    Imports are processed in batches of ``IMPORT_BATCH_SIZE`` rows: the
+    passwords of a batch are bcrypt-hashed in parallel in a process pool,
+    then the batch is written with one multi-row ``INSERT ... ON CONFLICT
+    DO NOTHING RETURNING`` and committed.
+    """
+
+    def __init__(self, batch_size: int = IMPORT_BATCH_SIZE, hash_workers: int = IMPORT_HASH_WORKERS):
+        self.batch_size = batch_size
+        self.hash_workers = hash_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Not fork: this process already runs threads (log listener, thread
+            # pool, cache listener) whose locks a forked child could inherit held
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.hash_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def import_format(self, content_type: Optional[str]) -> str:
+        fmt = IMPORT_FORMATS.get((content_type or "").split(";")[0].strip().lower())
+        if fmt is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Send users as application/x-ndjson or text/csv"
+            )
+        return fmt
+
+    async def _hash_all(self, passwords: List[str]) -> List[str]:
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        size = max(1, -(-len(passwords) // self.hash_workers))
+        chunks = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+        results = await asyncio.gather(*(loop.run_in_executor(pool, _hash_passwords, chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    def _insert(self, db: Session, rows: List[dict]) -> set:
+        """Insert rows, skipping emails that already exist, and return the emails inserted"""
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise RuntimeError(f"Bulk import is not supported on {dialect}")
+
+        stmt = insert(User).on_conflict_do_nothing(index_elements=["email"]).returning(User.email)
+        try:
+            inserted = set(db.execute(stmt, rows).scalars())
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        return inserted
+
+    async def _flush(self, db: Session, batch: List[Tuple[int, UserCreate]], result: ImportResult) -> None:
+        hashed = await self._hash_all([user.password for _, user in batch])
+        now = datetime.utcnow()
+        rows = [
+            {
+                "email": user.email,
+                "username": user.username,
+                "hashed_password": password_hash,
+                "is_active": True,
+                "created_at": now,
+            }
+            for (_, user), password_hash in zip(batch, hashed)
+        ]
+        inserted = await asyncio.to_thread(self._insert, db, rows)
+        result.created += len(inserted)
+        for row_number, user in batch:
+            if user.email not in inserted:
+                self._fail(result, row_number, user.email, "Email already registered")
+
+    def _fail(self, result: ImportResult, row_number: int, email: Optional[str], error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < MAX_REPORTED_ERRORS:
+            result.errors.append(ImportRowError(row=row_number, email=email, error=error))
+        else:
+            result.errors_truncated = True
+
+    async def import_users(self, db: Session, chunks: AsyncIterator[bytes], fmt: str) -> ImportResult:
+        result = ImportResult(created=0, failed=0, errors=[])
+        batch: List[Tuple[int, UserCreate]] = []
+        seen: set = set()
+
+        async for row_number, row in iter_rows(chunks, fmt):
+            if isinstance(row, ValueError):
+                self._fail(result, row_number, None, str(row))
+                continue
+            try:
+                user = UserCreate.model_validate(row)
+            except ValidationError as e:
+                error = e.errors()[0]
+                field = ".".join(str(part) for part in error["loc"])
+                self._fail(result, row_number, row.get("email"), f"{field}: {error['msg']}")
+                continue
+            if user.email in seen:
+                self._fail(result, row_number, user.email, "Duplicate email in upload")
+                continue
+            seen.add(user.email)
+            batch.append((row_number, user))
+            if len(batch) >= self.batch_size:
+                await self._flush(db, batch, result)
+                batch = []
+
+        if batch:
+            await self._flush(db, batch, result)
+        return result
+
+    def export_users(self, bind, fmt: str) -> Iterator[str]:
+        """Stream every user as NDJSON or CSV without loading them all into memory.
+
+        Uses its own session on ``bind`` because the request's session is
+        closed before the response body is sent.
+        """
+        columns = [getattr(User, name) for name in EXPORT_COLUMNS]
+        db = Session(bind=bind)
+        try:
+            result = db.execute(
+                select(*columns).order_by(User.created_at, User.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_COLUMNS)
+                for rows in result.partitions():
+                    writer.writerows(
+                        [str(value) if value is not None else "" for value in row] for row in rows
+                    )
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                if buffer.tell():
+                    yield buffer.getvalue()
+            else:
+                for rows in result.partitions():
+                    yield "".join(
+                        json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + "\n" for row in rows
+                    )
+        finally:
+            db.close()
+
+
+# Global instance shared by the admin routes
+provisioning_controller = ProvisioningController()
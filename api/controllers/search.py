@@ -0,0 +1,263 @@
+import base64
+import json
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+from models.conversation import ChatMessage
+from schemas.search import SearchHit, SearchResponse
+from utils.embeddings import EmbeddingIndex, HashingEmbedder, TOKEN_PATTERN, numpy_available
+
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+
+# Candidates taken from each ranker before reciprocal rank fusion
+HYBRID_POOL_SIZE = 200
+RRF_K = 60
+
+
+def encode_cursor(score: float, message_id: int) -> str:
+    raw = json.dumps({"s": score, "id": message_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        return float(data["s"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _after_cursor(score: float, message_id: int, after: Optional[Tuple[float, int]]) -> bool:
+    if after is None:
+        return True
+    return score < after[0] or (score == after[0] and message_id < after[1])
+
+
+class SearchController:
+    """Keyword, semantic and hybrid search over a user's chat messages.
+
+    Keyword search uses the ``search_vector`` tsvector column on PostgreSQL
+    and falls back to ``LIKE`` matching elsewhere. Semantic search uses an
+    in-process ``EmbeddingIndex`` and is only available when numpy is
+    installed and ``SEMANTIC_SEARCH`` is not ``false``.
+    """
+
+    def __init__(self):
+        self.embedder = None
+        self.index = None
+        self._stop_rebuild = threading.Event()
+        self._lock = threading.Lock()
+        # Ids indexed by requests while a rebuild runs, so it doesn't add them again
+        self._indexed_during_rebuild: Optional[set] = None
+        if numpy_available() and os.getenv("SEMANTIC_SEARCH", "true").lower() == "true":
+            dim = int(os.getenv("EMBEDDING_DIM", "256"))
+            self.embedder = HashingEmbedder(dim)
+            self.index = EmbeddingIndex(dim, os.getenv("EMBEDDING_INDEX_PATH") or None)
+
+    @property
+    def semantic_enabled(self) -> bool:
+        return self.index is not None
+
+    def index_messages(self, messages: Iterable[ChatMessage]) -> None:
+        if not self.semantic_enabled:
+            return
+        messages = list(messages)
+        if not messages:
+            return
+        vectors = self.embedder.embed([m.content for m in messages])
+        with self._lock:
+            if self._indexed_during_rebuild is not None:
+                self._indexed_during_rebuild.update(m.id for m in messages)
+            self.index.add([m.id for m in messages], [m.user_id for m in messages], vectors)
+
+    def _index_missing(self, messages: List[ChatMessage]) -> int:
+        vectors = self.embedder.embed([m.content for m in messages])
+        with self._lock:
+            # Written and indexed by a request since the rebuild looked at the index
+            keep = [i for i, m in enumerate(messages) if m.id not in self._indexed_during_rebuild]
+            if keep:
+                self.index.add(
+                    [messages[i].id for i in keep], [messages[i].user_id for i in keep], vectors[keep]
+                )
+        return len(keep)
+
+    def rebuild_index(self, db: Session, batch_size: int = 1000) -> int:
+        """Index every stored message the index doesn't have yet.
+
+        Runs alongside live traffic at startup. Only messages that existed
+        when it began are considered (later ones are indexed on write), and
+        ids already in the index are skipped, whether they come from an
+        on-disk index or from writes that got there first; so an on-disk
+        index that fell behind is topped up rather than rebuilt.
+        """
+        if not self.semantic_enabled:
+            return 0
+
+        with self._lock:
+            self._indexed_during_rebuild = set()
+        try:
+            last_id = db.scalar(select(func.max(ChatMessage.id)))
+            if last_id is None:
+                return 0
+            stored = db.scalars(select(ChatMessage.id).where(ChatMessage.id <= last_id)).all()
+            missing = self.index.missing(stored).tolist()
+
+            count = 0
+            for start in range(0, len(missing), batch_size):
+                if self._stop_rebuild.is_set():
+                    break
+                ids = missing[start:start + batch_size]
+                messages = db.scalars(
+                    select(ChatMessage).where(ChatMessage.id.in_(ids)).order_by(ChatMessage.id)
+                ).all()
+                count += self._index_missing(messages)
+            return count
+        finally:
+            with self._lock:
+                self._indexed_during_rebuild = None
+
+    def stop_rebuild(self) -> None:
+        """Make a running ``rebuild_index`` return after its current batch"""
+        self._stop_rebuild.set()
+
+    def _keyword(
+        self,
+        db: Session,
+        user_id: UUID,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[int, float]]:
+        if db.get_bind().dialect.name == "postgresql":
+            tsquery = func.websearch_to_tsquery("english", query)
+            vector = literal_column("chat_messages.search_vector")
+            score = func.ts_rank_cd(vector, tsquery)
+            stmt = select(ChatMessage.id, score.label("score")).where(
+                ChatMessage.user_id == user_id,
+                vector.op("@@")(tsquery),
+            )
+            if after is not None:
+                stmt = stmt.where(or_(score < after[0], and_(score == after[0], ChatMessage.id < after[1])))
+            stmt = stmt.order_by(score.desc(), ChatMessage.id.desc()).limit(limit)
+            return [(row.id, float(row.score)) for row in db.execute(stmt)]
+
+        terms = TOKEN_PATTERN.findall(query.lower())
+        if not terms:
+            return []
+        stmt = select(ChatMessage.id).where(
+            ChatMessage.user_id == user_id,
+            *[func.lower(ChatMessage.content).contains(term, autoescape=True) for term in terms],
+        )
+        if after is not None:
+            stmt = stmt.where(ChatMessage.id < after[1])
+        stmt = stmt.order_by(ChatMessage.id.desc()).limit(limit)
+        return [(message_id, 0.0) for message_id in db.scalars(stmt)]
+
+    def _semantic(
+        self,
+        user_id: UUID,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[int, float]]:
+        vector = self.embedder.embed([query])[0]
+        return self.index.search(user_id, vector, limit, after)
+
+    def _hybrid(
+        self,
+        db: Session,
+        user_id: UUID,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[int, float]]:
+        fused: Dict[int, float] = {}
+        for ranked in (
+            self._keyword(db, user_id, query, HYBRID_POOL_SIZE),
+            self._semantic(user_id, query, HYBRID_POOL_SIZE),
+        ):
+            for rank, (message_id, _) in enumerate(ranked):
+                fused[message_id] = fused.get(message_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        ranked = sorted(fused.items(), key=lambda item: (-item[1], -item[0]))
+        return [(i, s) for i, s in ranked if _after_cursor(s, i, after)][:limit]
+
+    def search(
+        self,
+        db: Session,
+        user_id: UUID,
+        query: str,
+        mode: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> SearchResponse:
+        query = query.strip()
+        if not query:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Please provide a search query."
+            )
+
+        mode = mode or ("hybrid" if self.semantic_enabled else "keyword")
+        if mode not in SEARCH_MODES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown search mode, expected one of {', '.join(SEARCH_MODES)}"
+            )
+        if mode == "semantic" and not self.semantic_enabled:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Semantic search is not enabled"
+            )
+        if mode == "hybrid" and not self.semantic_enabled:
+            mode = "keyword"
+
+        after = decode_cursor(cursor) if cursor else None
+        if mode == "keyword":
+            ranked = self._keyword(db, user_id, query, limit, after)
+        elif mode == "semantic":
+            ranked = self._semantic(user_id, query, limit, after)
+        else:
+            ranked = self._hybrid(db, user_id, query, limit, after)
+
+        messages = {}
+        if ranked:
+            # The user_id filter is repeated here so a stale index entry can never leak
+            rows = db.scalars(select(ChatMessage).where(
+                ChatMessage.user_id == user_id,
+                ChatMessage.id.in_([message_id for message_id, _ in ranked]),
+            ))
+            messages = {message.id: message for message in rows}
+
+        items = [
+            SearchHit(
+                id=message_id,
+                conversation_id=messages[message_id].conversation_id,
+                role=messages[message_id].role,
+                content=messages[message_id].content,
+                created_at=messages[message_id].created_at,
+                score=score,
+            )
+            for message_id, score in ranked
+            if message_id in messages
+        ]
+
+        next_cursor = None
+        if len(ranked) == limit:
+            next_cursor = encode_cursor(ranked[-1][1], ranked[-1][0])
+
+        return SearchResponse(mode=mode, items=items, next_cursor=next_cursor)
+
+
+# Global instance for dependency injection
+search_controller = SearchController()
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from models.session import UserSession
+from utils.denylist import session_denylist
+from utils.jwt import REFRESH_TOKEN_EXPIRE_DAYS
+
+# How often each worker pulls revocations made by other workers
+SESSION_SYNC_INTERVAL = float(os.getenv("SESSION_SYNC_INTERVAL", "5"))
+# Overlap between syncs so clock skew between workers can't hide a revocation
+SYNC_OVERLAP = timedelta(seconds=60)
+
+logger = logging.getLogger(__name__)
+
+
+class SessionController:
+    def __init__(self, sync_interval: float = SESSION_SYNC_INTERVAL):
+        self.sync_interval = sync_interval
+        self._synced_until: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def create_session(
+        self,
+        db: Session,
+        user_id: UUID,
+        user_agent: Optional[str] = None,
+        ip_address: Optional[str] = None,
+    ) -> UserSession:
+        session = UserSession(
+            user_id=user_id,
+            user_agent=user_agent[:255] if user_agent else None,
+            ip_address=ip_address,
+            expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+        db.add(session)
+        db.flush()
+        return session
+
+    def extend_session(self, db: Session, session_id: UUID) -> None:
+        """Push a session's expiry out when its refresh token is rotated"""
+        db.query(UserSession).filter(UserSession.id == session_id).update(
+            {UserSession.expires_at: datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)}
+        )
+
+    def list_sessions(self, db: Session, user_id: UUID) -> List[UserSession]:
+        return (
+            db.query(UserSession)
+            .filter(
+                UserSession.user_id == user_id,
+                UserSession.revoked_at.is_(None),
+                UserSession.expires_at > datetime.utcnow(),
+            )
+            .order_by(UserSession.created_at.desc())
+            .all()
+        )
+
+    def _revoke(self, db: Session, sessions: List[UserSession]) -> int:
+        now = datetime.utcnow()
+        # Read before the commit expires the rows, or each would be refreshed one by one
+        revoked = [(session.id, session.expires_at) for session in sessions]
+        for session in sessions:
+            session.revoked_at = now
+        db.commit()
+        # This worker stops accepting the tokens immediately; others on their next sync
+        session_denylist.add(revoked)
+        return len(sessions)
+
+    def revoke_session(self, db: Session, user_id: UUID, session_id: UUID) -> bool:
+        session = (
+            db.query(UserSession)
+            .filter(
+                UserSession.id == session_id,
+                UserSession.user_id == user_id,
+                UserSession.revoked_at.is_(None),
+            )
+            .first()
+        )
+        if not session:
+            return False
+        self._revoke(db, [session])
+        return True
+
+    def revoke_all(self, db: Session, user_id: UUID) -> int:
+        return self._revoke(db, self.list_sessions(db, user_id))
+
+    def sync(self, db: Session) -> int:
+        """Load revocations since the last sync into the denylist and drop expired entries"""
+        now = datetime.utcnow()
+        query = db.query(UserSession.id, UserSession.expires_at).filter(
+            UserSession.revoked_at.isnot(None),
+            UserSession.expires_at > now,
+        )
+        if self._synced_until is not None:
+            query = query.filter(UserSession.revoked_at >= self._synced_until - SYNC_OVERLAP)
+        rows = query.all()
+        session_denylist.add(rows)
+        session_denylist.prune(now)
+        self._synced_until = now
+        return len(rows)
+
+    def _sync_with(self, session_factory: Callable[[], Session]) -> int:
+        db = session_factory()
+        try:
+            return self.sync(db)
+        finally:
+            db.close()
+
+    async def run(self, session_factory: Callable[[], Session]) -> None:
+        """Sync the denylist every ``sync_interval`` seconds until cancelled"""
+        while True:
+            try:
+                await asyncio.to_thread(self._sync_with, session_factory)
+            except Exception as e:
+                logger.error("Error syncing revoked sessions: %s", e)
+            await asyncio.sleep(self.sync_interval)
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(session_factory))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global instance shared by the auth routes and the sync loop
+session_controller = SessionController()
@@ -0,0 +1,75 @@
+import asyncio
+import os
+from contextlib import aclosing
+from typing import AsyncIterator
+
+from fastapi import Request
+
+from prompts import prefix_cache, prompt_registry
+from providers.base import LLMProvider
+
+# Upper bound on generations running at once in this worker (HTTP and WebSocket)
+GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "32"))
+
+generation_slots = asyncio.Semaphore(GENERATION_CONCURRENCY)
+
+
+async def stream_reply(provider: LLMProvider, prompt: str, template: str = "chat") -> AsyncIterator[str]:
+    """Render ``prompt`` with a registered template and stream the provider's reply.
+
+    The template's system prompt is sent as a provider cache handle when
+    one is available.
+    """
+    rendered = prompt_registry.render(template, message=prompt)
+    cached_content = await prefix_cache.acquire(provider, rendered.system)
+    async with aclosing(provider.stream(rendered.text, system=rendered.system, cached_content=cached_content)) as chunks:
+        async for chunk in chunks:
+            yield chunk
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Return once the ASGI server reports ``http.disconnect`` for this request.
+
+    Sets ``request.state.disconnected``. Only call this after the request
+    body has been read.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            request.state.disconnected = True
+            return
+
+
+async def stream_until_disconnect(request: Request, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    """Relay ``chunks`` until they end or the client goes away.
+
+    Each pull from the upstream generator races against a disconnect
+    watcher. On disconnect the pending pull is cancelled, which raises
+    ``CancelledError`` inside the provider at its current await (closing its
+    HTTP request), and no further chunks are requested.
+    """
+    async with aclosing(chunks):
+        watcher = asyncio.create_task(wait_for_disconnect(request))
+        pull = None
+        try:
+            while True:
+                pull = asyncio.ensure_future(chunks.__anext__())
+                done, _ = await asyncio.wait({pull, watcher}, return_when=asyncio.FIRST_COMPLETED)
+                if pull not in done:
+                    return
+                try:
+                    chunk = pull.result()
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            watcher.cancel()
+            if pull is not None and not pull.done():
+                pull.cancel()
+                # The pull must settle before aclose(), even if we are being
+                # cancelled ourselves (e.g. by the response's disconnect listener)
+                while not pull.done():
+                    try:
+                        await asyncio.wait({pull})
+                    except asyncio.CancelledError:
+                        pass
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models.usage import Usage, UsageDaily
+from schemas.usage import UsageDay, UsageSummary
+
+# Buffer key: (user_id, model, minute bucket) -> [prompt_tokens, completion_tokens, requests]
+UsageKey = Tuple[UUID, str, datetime]
+
+USAGE_COUNTERS = ("prompt_tokens", "completion_tokens", "requests")
+
+logger = logging.getLogger(__name__)
+
+
+def _upsert(db: Session, table, rows: List[dict], keys: List[str]) -> None:
+    """Bulk insert rows, adding the counters onto any existing row with the same key"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Usage upserts are not supported on {dialect}")
+
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: table.c[name] + stmt.excluded[name] for name in USAGE_COUNTERS},
+    )
+    db.execute(stmt, rows)
+
+
+def ensure_usage_partitions(engine: Engine, months_ahead: int = 2) -> None:
+    """Create monthly partitions of the ``usage`` table (PostgreSQL only)"""
+    if engine.dialect.name != "postgresql":
+        return
+
+    start = datetime.utcnow().date().replace(day=1)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS usage_default PARTITION OF usage DEFAULT"))
+        for _ in range(months_ahead + 1):
+            end = (start + timedelta(days=32)).replace(day=1)
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS usage_{start:%Y_%m} PARTITION OF usage "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+            start = end
+
+
+class UsageMeter:
+    """Aggregates token usage in memory and flushes it to the database in bulk.
+
+    ``record`` is called on the request path and only touches a dict under a
+    lock; ``flush`` turns the buffer into one upsert for ``usage`` and one for
+    ``usage_daily``.
+    """
+
+    def __init__(self, flush_interval: float = 10.0):
+        self.flush_interval = flush_interval
+        self._buffer: Dict[UsageKey, List[int]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        user_id: UUID,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        at: Optional[datetime] = None,
+    ) -> None:
+        bucket = (at or datetime.utcnow()).replace(second=0, microsecond=0)
+        key = (user_id, model, bucket)
+        with self._lock:
+            counters = self._buffer.get(key)
+            if counters is None:
+                self._buffer[key] = [prompt_tokens, completion_tokens, 1]
+            else:
+                counters[0] += prompt_tokens
+                counters[1] += completion_tokens
+                counters[2] += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def _drain(self) -> Dict[UsageKey, List[int]]:
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+        return buffer
+
+    def _restore(self, buffer: Dict[UsageKey, List[int]]) -> None:
+        with self._lock:
+            for key, (prompt, completion, requests) in buffer.items():
+                counters = self._buffer.setdefault(key, [0, 0, 0])
+                counters[0] += prompt
+                counters[1] += completion
+                counters[2] += requests
+
+    def flush(self, db: Session) -> int:
+        """Write the buffered counters and return the number of minute rows flushed"""
+        buffer = self._drain()
+        if not buffer:
+            return 0
+
+        minute_rows = []
+        daily: Dict[Tuple[UUID, str, date], List[int]] = {}
+        for (user_id, model, bucket), (prompt, completion, requests) in buffer.items():
+            minute_rows.append({
+                "user_id": user_id,
+                "model": model,
+                "bucket": bucket,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "requests": requests,
+            })
+            counters = daily.setdefault((user_id, model, bucket.date()), [0, 0, 0])
+            counters[0] += prompt
+            counters[1] += completion
+            counters[2] += requests
+
+        daily_rows = [
+            {
+                "user_id": user_id,
+                "model": model,
+                "day": day,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "requests": requests,
+            }
+            for (user_id, model, day), (prompt, completion, requests) in daily.items()
+        ]
+
+        try:
+            _upsert(db, Usage.__table__, minute_rows, ["user_id", "model", "bucket"])
+            _upsert(db, UsageDaily.__table__, daily_rows, ["user_id", "model", "day"])
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the counts for the next attempt instead of dropping them
+            self._restore(buffer)
+            raise
+
+        return len(minute_rows)
+
+    async def run(self, session_factory: Callable[[], Session]) -> None:
+        """Flush the buffer every ``flush_interval`` seconds until cancelled"""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if not self._buffer:
+                continue
+            try:
+                await asyncio.to_thread(self._flush_with, session_factory)
+            except Exception as e:
+                logger.error("Error flushing usage: %s", e)
+
+    def _flush_with(self, session_factory: Callable[[], Session]) -> int:
+        db = session_factory()
+        try:
+            return self.flush(db)
+        finally:
+            db.close()
+
+    def start(self, session_factory: Callable[[], Session]) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(session_factory))
+
+    async def stop(self, session_factory: Callable[[], Session]) -> None:
+        """Cancel the flush loop and write whatever is still buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._buffer:
+            await asyncio.to_thread(self._flush_with, session_factory)
+
+    def get_daily_usage(self, db: Session, user_id: UUID, days: int = 30) -> UsageSummary:
+        # Buckets are UTC, so the window must be too
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        rows = (
+            db.query(UsageDaily)
+            .filter(UsageDaily.user_id == user_id, UsageDaily.day >= since)
+            .order_by(UsageDaily.day, UsageDaily.model)
+            .all()
+        )
+
+        items = [
+            UsageDay(
+                day=row.day,
+                model=row.model,
+                prompt_tokens=row.prompt_tokens,
+                completion_tokens=row.completion_tokens,
+                total_tokens=row.prompt_tokens + row.completion_tokens,
+                requests=row.requests,
+            )
+            for row in rows
+        ]
+        return UsageSummary(
+            user_id=user_id,
+            since=since,
+            days=items,
+            prompt_tokens=sum(item.prompt_tokens for item in items),
+            completion_tokens=sum(item.completion_tokens for item in items),
+            total_tokens=sum(item.total_tokens for item in items),
+        )
+
+
+# Global instance shared by the chat routes and the flush loop
+usage_meter = UsageMeter()
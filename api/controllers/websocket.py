@@ -0,0 +1,250 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import aclosing
+from typing import Dict, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.orm import Session
+from starlette.websockets import WebSocketState
+
+from controllers.conversation import conversation_controller
+from controllers.streaming import generation_slots, stream_reply
+from controllers.drain import drain_controller
+from controllers.usage import usage_meter
+from providers import LLMProvider
+from schemas.auth import TokenData
+from utils.denylist import session_denylist
+from utils.tokens import estimate_tokens
+
+HEARTBEAT_INTERVAL = float(os.getenv("WS_HEARTBEAT_INTERVAL", "20"))
+IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", "60"))
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+MAX_STREAMS_PER_CONNECTION = int(os.getenv("WS_MAX_STREAMS", "4"))
+MAX_FRAME_BYTES = 64 * 1024
+
+
+class ChatConnection:
+    """One authenticated chat WebSocket carrying several concurrent generations.
+
+    Client frames::
+
+        {"type": "start", "stream_id": "a", "prompt": "...", "conversation_id": null}
+        {"type": "cancel", "stream_id": "a"}
+        {"type": "ping"} / {"type": "pong"}
+
+    Server frames are ``ready``, ``start``, ``delta``, ``done``, ``cancelled``,
+    ``error``, ``ping`` and ``pong``; all but the keep-alives carry the
+    ``stream_id`` they belong to.
+
+    Outgoing frames go through a bounded queue drained by a single writer
+    task, so a slow reader applies backpressure to the generations instead
+    of growing memory. The writer doubles as the heartbeat: it sends a
+    ``ping`` whenever the queue has been empty for ``HEARTBEAT_INTERVAL``.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        user: TokenData,
+        provider: LLMProvider,
+        db: Session,
+        expires_at: Optional[float] = None,
+    ):
+        self.websocket = websocket
+        self.user = user
+        self.expires_at = expires_at
+        self.provider = provider
+        self.db = db
+        self.streams: Dict[str, asyncio.Task] = {}
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.closed = False
+        self.close_code = 1000
+        self.close_reason: Optional[str] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    async def send(self, frame: dict) -> None:
+        if not self.closed:
+            await self.queue.put(frame)
+
+    async def _write_loop(self) -> None:
+        while True:
+            try:
+                frame = await asyncio.wait_for(self.queue.get(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                frame = {"type": "ping"}
+            await self.websocket.send_text(json.dumps(frame))
+
+    def _authorized(self) -> bool:
+        """The access token was checked on connect; revocation and expiry can happen since"""
+        if self.expires_at is not None and self.expires_at <= time.time():
+            return False
+        session_id = self.user.session_id
+        return session_id is None or not session_denylist.is_revoked(str(session_id))
+
+    async def serve(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+        await self.send({"type": "ready", "user_id": str(self.user.user_id)})
+        try:
+            while not self._writer.done() and self.close_reason is None:
+                try:
+                    message = await asyncio.wait_for(self.websocket.receive(), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    if self.streams:
+                        continue
+                    self.close_reason = "idle timeout"
+                    break
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+                if message.get("text") is None:
+                    await self.send({"type": "error", "detail": "Binary frames are not supported"})
+                    continue
+                await self.handle(message["text"])
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await self.shutdown()
+
+        if self.close_reason and self.websocket.client_state == WebSocketState.CONNECTED:
+            await self.websocket.close(code=self.close_code, reason=self.close_reason)
+
+    async def handle(self, raw: str) -> None:
+        # Counted in UTF-8 bytes; the character count alone is a cheap early reject
+        if len(raw) > MAX_FRAME_BYTES or len(raw.encode()) > MAX_FRAME_BYTES:
+            await self.send({"type": "error", "detail": "Frame too large"})
+            return
+        try:
+            frame = json.loads(raw)
+            frame_type = frame.get("type")
+        except (ValueError, AttributeError):
+            await self.send({"type": "error", "detail": "Invalid frame"})
+            return
+
+        if frame_type == "ping":
+            await self.send({"type": "pong"})
+        elif frame_type == "pong":
+            pass
+        elif frame_type == "start":
+            await self._start(frame)
+        elif frame_type == "cancel":
+            stream_id = frame.get("stream_id")
+            if not isinstance(stream_id, str):
+                await self.send({"type": "error", "detail": "stream_id must be a string"})
+                return
+            task = self.streams.get(stream_id)
+            if task is None:
+                await self.send({"type": "error", "stream_id": stream_id, "detail": "Unknown stream"})
+            else:
+                task.cancel()
+        else:
+            await self.send({"type": "error", "detail": f"Unknown frame type: {frame_type}"})
+
+    async def _start(self, frame: dict) -> None:
+        if not self._authorized():
+            # Ends the read loop; shutdown() then cancels the streams still running
+            self.close_code = status.WS_1008_POLICY_VIOLATION
+            self.close_reason = "Session expired or revoked"
+            return
+        stream_id = frame.get("stream_id")
+        prompt = frame.get("prompt")
+        if not isinstance(stream_id, str) or not stream_id:
+            await self.send({"type": "error", "detail": "stream_id is required"})
+            return
+        if stream_id in self.streams:
+            await self.send({"type": "error", "stream_id": stream_id, "detail": "Stream already active"})
+            return
+        if not isinstance(prompt, str) or not prompt.strip():
+            await self.send({"type": "error", "stream_id": stream_id, "detail": "Please provide a valid prompt for text generation."})
+            return
+        if len(self.streams) >= MAX_STREAMS_PER_CONNECTION:
+            await self.send({"type": "error", "stream_id": stream_id, "detail": "Too many concurrent streams"})
+            return
+        if drain_controller.draining:
+            await self.send({"type": "error", "stream_id": stream_id, "detail": "Server is restarting, please reconnect."})
+            return
+
+        conversation_id = frame.get("conversation_id")
+        try:
+            conversation_id = UUID(conversation_id) if conversation_id else None
+        except (ValueError, TypeError):
+            await self.send({"type": "error", "stream_id": stream_id, "detail": "Invalid conversation_id"})
+            return
+
+        self.streams[stream_id] = asyncio.create_task(
+            self._run_stream(stream_id, prompt.strip(), conversation_id)
+        )
+
+    def _open_conversation(self, conversation_id: Optional[UUID], prompt: str) -> UUID:
+        try:
+            conversation = conversation_controller.get_or_create_conversation(
+                self.db, self.user.user_id, conversation_id, title=prompt
+            )
+            conversation_id = conversation.id
+            self.db.commit()
+            return conversation_id
+        finally:
+            # Never keep a pooled connection checked out while generating
+            self.db.close()
+
+    def _save_turn(self, conversation_id: UUID, prompt: str, reply: str) -> None:
+        try:
+            conversation = conversation_controller.get_conversation(self.db, self.user.user_id, conversation_id)
+            if conversation:
+                conversation_controller.add_turn(self.db, conversation, prompt, reply)
+        finally:
+            self.db.close()
+
+    async def _run_stream(self, stream_id: str, prompt: str, conversation_id: Optional[UUID]) -> None:
+        with drain_controller.track():
+            parts = []
+            started = False
+            try:
+                conversation_id = self._open_conversation(conversation_id, prompt)
+                await self.send({"type": "start", "stream_id": stream_id, "conversation_id": str(conversation_id)})
+                started = True
+
+                async with generation_slots, aclosing(stream_reply(self.provider, prompt)) as chunks:
+                    async for chunk in chunks:
+                        parts.append(chunk)
+                        await self.send({"type": "delta", "stream_id": stream_id, "text": chunk})
+
+                reply = "".join(parts)
+                self._save_turn(conversation_id, prompt, reply)
+                await self.send({
+                    "type": "done",
+                    "stream_id": stream_id,
+                    "usage": {
+                        "prompt_tokens": estimate_tokens(prompt),
+                        "completion_tokens": estimate_tokens(reply),
+                    },
+                })
+            except asyncio.CancelledError:
+                if not self.closed:
+                    await self.send({"type": "cancelled", "stream_id": stream_id})
+            except HTTPException as e:
+                await self.send({"type": "error", "stream_id": stream_id, "detail": e.detail})
+            except Exception:
+                await self.send({"type": "error", "stream_id": stream_id, "detail": "Failed to process stream request"})
+            finally:
+                self.streams.pop(stream_id, None)
+                if started:
+                    # Tokens pulled before a cancel or failure are still billed
+                    usage_meter.record(
+                        self.user.user_id,
+                        self.provider.model,
+                        prompt_tokens=estimate_tokens(prompt),
+                        completion_tokens=estimate_tokens("".join(parts)),
+                    )
+
+    async def shutdown(self) -> None:
+        self.closed = True
+        tasks = list(self.streams.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
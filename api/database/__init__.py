@@ -1,4 +1,5 @@
 from .connection import engine, SessionLocal, get_db
 from .base import Base
+from .routing import use_primary
 
-__all__ = ["engine", "SessionLocal", "get_db", "Base"]
\ No newline at end of file
+__all__ = ["engine", "SessionLocal", "get_db", "Base", "use_primary"]
\ No newline at end of file
@@ -0,0 +1,146 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Hashable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Delete, Insert, Select, Update
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping ones that recently failed.
+
+    A replica is taken out of rotation when it raises a disconnect or
+    connection error and put back after ``cooldown`` seconds. When every
+    replica is down, reads fall back to the primary.
+    """
+
+    def __init__(self, engines: List[Engine], cooldown: float = 30.0):
+        self.engines = engines
+        self.cooldown = cooldown
+        self._down_until: Dict[Engine, float] = {}
+        self._cycle = itertools.cycle(engines) if engines else None
+        self._lock = threading.Lock()
+        for engine in engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def _on_error(self, context) -> None:
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+            self.mark_down(context.engine)
+
+    def mark_down(self, engine: Engine) -> None:
+        if engine not in self._down_until:
+            logger.warning("Replica %s taken out of rotation", engine.url.render_as_string(hide_password=True))
+        self._down_until[engine] = time.monotonic() + self.cooldown
+
+    def healthy(self) -> List[Engine]:
+        now = time.monotonic()
+        return [engine for engine in self.engines if self._down_until.get(engine, 0) <= now]
+
+    def next(self) -> Optional[Engine]:
+        """The next healthy replica, or ``None`` if there is none"""
+        if self._cycle is None:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.engines)):
+                engine = next(self._cycle)
+                down_until = self._down_until.get(engine)
+                if down_until is None:
+                    return engine
+                if down_until <= now:
+                    del self._down_until[engine]
+                    return engine
+        return None
+
+
+class WriteTracker:
+    """Remembers who wrote recently so their reads can stay on the primary.
+
+    Covers replication lag for read-your-writes: for ``window`` seconds
+    after a user's commit, that user's sessions read from the primary. The
+    state is per process.
+    """
+
+    def __init__(self, window: float = 5.0):
+        self.window = window
+        self._until: Dict[Hashable, float] = {}
+
+    def mark(self, key: Hashable) -> None:
+        self._until[key] = time.monotonic() + self.window
+        if len(self._until) > 10000:
+            self.prune()
+
+    def is_recent(self, key: Hashable) -> bool:
+        until = self._until.get(key)
+        return until is not None and until > time.monotonic()
+
+    def prune(self) -> None:
+        now = time.monotonic()
+        for key, until in list(self._until.items()):
+            if until <= now:
+                self._until.pop(key, None)
+
+
+class RoutingSession(Session):
+    """Session that sends plain SELECTs to a replica and everything else to the primary.
+
+    Reads go to the primary too when the session has already written, when
+    ``use_primary`` was called on it, or when ``info["user_id"]`` belongs to
+    a user who committed a write within the tracker's window.
+    """
+
+    def __init__(
+        self,
+        primary: Optional[Engine] = None,
+        replicas: Optional[ReplicaSet] = None,
+        writes: Optional[WriteTracker] = None,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.primary = primary
+        self.replicas = replicas
+        self.writes = writes
+
+    def _reads_from_primary(self) -> bool:
+        if self.info.get("primary") or self.info.get("wrote"):
+            return True
+        user_id = self.info.get("user_id")
+        return self.writes is not None and user_id is not None and self.writes.is_recent(user_id)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.primary is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            # Later reads in this session must see the write, replicas may lag
+            self.info["wrote"] = True
+            return self.primary
+        if (
+            self.replicas is not None
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+            and not self._reads_from_primary()
+        ):
+            replica = self.replicas.next()
+            if replica is not None:
+                return replica
+        return self.primary
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    if session.info.get("wrote") and session.writes is not None:
+        user_id = session.info.get("user_id")
+        if user_id is not None:
+            session.writes.mark(user_id)
+
+
+def use_primary(session: Session) -> None:
+    """Send every read of ``session`` to the primary"""
+    session.info["primary"] = True
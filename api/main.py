@@ -1,13 +1,42 @@
+import asyncio
+import logging
+import os
+from typing import Optional
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from routes import api_router
+from controllers.usage import usage_meter
+from controllers.session import session_controller
+from controllers.provisioning import provisioning_controller
+from controllers.drain import drain_controller
+from prompts import prompt_registry
+from cache import cache_manager
+from providers import close_provider
+from database.connection import SessionLocal, engine, replicas
+from middleware.request_logging import RequestLoggingMiddleware
+from middleware.concurrency_limit import ConcurrencyLimitMiddleware
+from utils.limiter import concurrency_limiter
+from utils.log import setup_logging, shutdown_logging
+from utils.serialization import DefaultJSONResponse
+
+setup_logging()
+logger = logging.getLogger(__name__)
+
+# Schema setup, index rebuild and the usage flush / session sync loops all
+# talk to DATABASE_URL; the test suite turns them off and uses its own engine
+BACKGROUND_SERVICES = os.getenv("BACKGROUND_SERVICES", "true").lower() == "true"
 
 app = FastAPI(
     title="FastAPI Backend with JWT Authentication",
     version="1.0.0",
-    description="Secure FastAPI backend with JWT authentication"
+    description="Secure FastAPI backend with JWT authentication",
+    default_response_class=DefaultJSONResponse,
 )
 
+# Adaptive load shedding (inside CORS so browsers can read the 503)
+app.add_middleware(ConcurrencyLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -17,24 +46,107 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request ids and sampled access logs (outermost, so it also times CORS)
+app.add_middleware(RequestLoggingMiddleware)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
+_index_task: Optional[asyncio.Task] = None
+
+
+def _rebuild_search_index() -> int:
+    from controllers.search import search_controller
+
+    db = SessionLocal()
+    try:
+        return search_controller.rebuild_index(db)
+    finally:
+        db.close()
+
+
+async def _load_search_index():
+    try:
+        indexed = await asyncio.to_thread(_rebuild_search_index)
+        if indexed:
+            logger.info("Search index loaded with %d messages", indexed)
+    except Exception as e:
+        logger.error("Error loading search index: %s", e)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Create database tables on startup"""
-    try:
-        from database.base import Base
-        from database.connection import engine
-        from models.user import User  # Import to register the model
+    # No-op on first start; restarts logging if a previous shutdown stopped it
+    setup_logging()
+    drain_controller.reset()
+    if BACKGROUND_SERVICES:
+        try:
+            from database.base import Base
+            from models.user import User  # Import to register the model
+            from models.usage import Usage, UsageDaily
+            from models.conversation import Conversation, ChatMessage
+            from models.session import UserSession
+            from controllers.usage import ensure_usage_partitions
         
-        Base.metadata.create_all(bind=engine)
-        print("Database tables created successfully!")
+            Base.metadata.create_all(bind=engine)
+            ensure_usage_partitions(engine)
+            logger.info("Database tables created successfully")
+        except Exception as e:
+            logger.error("Error creating database tables: %s", e)
+
+        # Loading a large history takes a while; serve requests meanwhile
+        # (semantic results fill in as it goes, keyword search is unaffected)
+        global _index_task
+        _index_task = asyncio.create_task(_load_search_index())
+
+    logger.info("Prompt templates active: %s", ", ".join(t.key for t in prompt_registry.active()))
+    cache_manager.start()
+    if BACKGROUND_SERVICES:
+        usage_meter.start(SessionLocal)
+        session_controller.start(SessionLocal)
+    drain_controller.install_signal_handler()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background work, flush write-behind buffers and close pools before the worker exits.
+
+    Active streams were already drained on SIGTERM (see ``DrainController``).
+    """
+    await session_controller.stop()
+    if _index_task is not None and not _index_task.done():
+        from controllers.search import search_controller
+
+        search_controller.stop_rebuild()
+        await _index_task
+    provisioning_controller.shutdown()
+    if BACKGROUND_SERVICES:
+        try:
+            await usage_meter.stop(SessionLocal)
+        except Exception as e:
+            logger.error("Error flushing usage on shutdown: %s", e)
+    try:
+        await close_provider()
     except Exception as e:
-        print(f"Error creating database tables: {e}")
+        logger.error("Error closing model provider: %s", e)
+
+    cache_manager.close()
+    engine.dispose()
+    for replica in replicas.engines:
+        replica.dispose()
+    logger.info("Shutdown complete")
+    shutdown_logging()
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "message": "FastAPI backend is running"}
\ No newline at end of file
+    return {"status": "healthy", "message": "FastAPI backend is running"}
+
+
+@app.get("/readyz")
+async def readiness_check():
+    """Readiness probe; 503 while the worker drains streams for a restart"""
+    body = {**drain_controller.status(), "concurrency": concurrency_limiter.stats()}
+    return JSONResponse(body, status_code=503 if drain_controller.draining else 200)
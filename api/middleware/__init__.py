@@ -1,3 +1,5 @@
 from .auth import AuthMiddleware
+from .request_logging import RequestLoggingMiddleware
+from .concurrency_limit import ConcurrencyLimitMiddleware
 
-__all__ = ["AuthMiddleware"]
\ No newline at end of file
+__all__ = ["AuthMiddleware", "RequestLoggingMiddleware", "ConcurrencyLimitMiddleware"]
\ No newline at end of file
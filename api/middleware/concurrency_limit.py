@@ -0,0 +1,98 @@
+import logging
+import os
+import time
+from typing import Dict, Optional
+
+from utils.limiter import ConcurrencyLimiter, Priority, concurrency_limiter
+from utils.serialization import DefaultJSONResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRIORITIES = (
+    "/health=critical,/readyz=critical,"
+    "/api/v1/auth/refresh=high,/api/v1/auth/logout=high,/api/v1/auth/stream-ticket/verify=high,"
+    "/api/v1/chat=low,/api/v1/admin=low"
+)
+
+
+def parse_priorities(spec: str) -> Dict[str, Priority]:
+    """Parse ``"/health=critical,/api/v1/chat=low"`` into a prefix -> priority mapping"""
+    priorities = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, name = item.partition("=")
+        priorities[prefix.strip()] = Priority[name.strip().upper()]
+    return priorities
+
+
+class ConcurrencyLimitMiddleware:
+    """Sheds HTTP requests with 503 once in-flight work exceeds an adaptive limit.
+
+    Each request is classified by longest matching path prefix and admitted
+    only while in-flight requests are under that class's share of the limit,
+    so new chat streams are refused before auth refreshes and health probes
+    are never refused. The slot is held until the response starts: for
+    streaming routes that is time to first byte, and the stream itself is
+    bounded by the generation slots. WebSockets pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: Optional[ConcurrencyLimiter] = None,
+        priorities: Optional[Dict[str, Priority]] = None,
+        default_priority: Priority = Priority.NORMAL,
+    ):
+        self.app = app
+        self.limiter = limiter or concurrency_limiter
+        if priorities is None:
+            priorities = parse_priorities(os.getenv("CONCURRENCY_PRIORITIES", DEFAULT_PRIORITIES))
+        # Longest prefix first so the most specific rule wins
+        self.priorities = sorted(priorities.items(), key=lambda item: len(item[0]), reverse=True)
+        self.default_priority = default_priority
+        self.enabled = os.getenv("CONCURRENCY_LIMIT_ENABLED", "true").lower() == "true"
+
+    def priority(self, path: str) -> Priority:
+        for prefix, priority in self.priorities:
+            if path.startswith(prefix):
+                return priority
+        return self.default_priority
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            return await self.app(scope, receive, send)
+
+        limiter = self.limiter
+        if not limiter.try_acquire(self.priority(scope["path"])):
+            response = DefaultJSONResponse(
+                {"detail": "Server is overloaded, please retry shortly."},
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            return await response(scope, receive, send)
+
+        start = time.perf_counter()
+        released = False
+
+        def release(dropped: bool, sample: bool = True) -> None:
+            nonlocal released
+            if not released:
+                released = True
+                # The router stores the matched route on the scope; fall back so 404s share one key
+                route = getattr(scope.get("route"), "path", "unmatched")
+                limiter.release(route, start, time.perf_counter(), dropped, sample)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # 503s are our own refusals (draining, shedding further in), not
+                # a sign of overload, so they neither shrink nor time the limit
+                status_code = message["status"]
+                release(status_code >= 500 and status_code != 503, sample=status_code != 503)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException:
+            release(True)
+            raise
+        finally:
+            release(False)
@@ -0,0 +1,118 @@
+import logging
+import os
+import random
+import re
+import time
+from typing import Dict, Optional
+
+from utils.log import request_id_var, trace_id_var
+
+logger = logging.getLogger("api.request")
+
+REQUEST_ID_HEADER = "x-request-id"
+TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+VALID_REQUEST_ID = re.compile(r"^[\w\-.]{1,128}$")
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse ``"/health=0,/api/v1/chat=0.1"`` into a prefix -> rate mapping"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, rate = item.partition("=")
+        rates[prefix.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class RequestLoggingMiddleware:
+    """Assigns request/trace ids and emits one sampled access-log record per request.
+
+    The ids come from ``X-Request-ID`` and W3C ``traceparent`` headers when
+    present, are stored in contextvars for every log record emitted while
+    handling the request, and the request id is echoed back in the response.
+    Sampling is per longest matching path prefix (10% by default, which keeps
+    the per-request cost within the ``benchmarks/bench_logging.py`` budget);
+    server errors and requests slower than ``LOG_SLOW_MS`` (time to first
+    byte for streamed responses and WebSockets) are always logged.
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rates: Optional[Dict[str, float]] = None,
+        default_rate: Optional[float] = None,
+        slow_ms: Optional[float] = None,
+    ):
+        self.app = app
+        if sample_rates is None:
+            sample_rates = parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", "/health=0,/readyz=0"))
+        # Longest prefix first so the most specific rule wins
+        self.sample_rates = sorted(sample_rates.items(), key=lambda item: len(item[0]), reverse=True)
+        self.default_rate = default_rate if default_rate is not None else float(os.getenv("LOG_SAMPLE_DEFAULT", "0.1"))
+        self.slow_seconds = (slow_ms if slow_ms is not None else float(os.getenv("LOG_SLOW_MS", "1000"))) / 1000
+
+    def sample_rate(self, path: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.default_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        request_id = trace_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+            elif name == b"traceparent":
+                match = TRACEPARENT.match(value.decode("latin-1"))
+                if match:
+                    trace_id = match.group(1)
+        request_id = request_id or os.urandom(16).hex()
+        trace_id = trace_id or request_id
+
+        request_token = request_id_var.set(request_id)
+        trace_token = trace_id_var.set(trace_id)
+        status_code = 101 if scope["type"] == "websocket" else 500
+        start = time.perf_counter()
+        first_byte = None
+        streamed = scope["type"] == "websocket"
+
+        async def send_wrapper(message):
+            nonlocal status_code, first_byte, streamed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                first_byte = time.perf_counter()
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            elif message["type"] == "http.response.body":
+                streamed = streamed or message.get("more_body", False)
+            elif message["type"] in ("websocket.accept", "websocket.close") and first_byte is None:
+                first_byte = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            path = scope["path"]
+            duration = time.perf_counter() - start
+            # Streams and sockets are long by design; for them only a slow start counts
+            latency = first_byte - start if streamed and first_byte else duration
+            if status_code >= 500 or latency >= self.slow_seconds or random.random() < self.sample_rate(path):
+                logger.info(
+                    "%s %s %s",
+                    scope.get("method", "WS"),
+                    path,
+                    status_code,
+                    extra={
+                        "method": scope.get("method", "WS"),
+                        "path": path,
+                        "status": status_code,
+                        "duration_ms": round(duration * 1000, 3),
+                        # Time to response start; differs from duration_ms for streams
+                        "ttfb_ms": round((first_byte - start) * 1000, 3) if first_byte else None,
+                    },
+                )
+            request_id_var.reset(request_token)
+            trace_id_var.reset(trace_token)
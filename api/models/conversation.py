@@ -0,0 +1,60 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Text, DateTime, BigInteger, Integer, ForeignKey, Index, DDL, event
+from sqlalchemy.dialects.postgresql import UUID
+
+from database.base import Base
+
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    title = Column(String(200), nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<Conversation(id={self.id}, user_id={self.user_id}, title={self.title})>"
+
+
+class ChatMessage(Base):
+    """A single chat turn.
+
+    On PostgreSQL the table also carries a generated ``search_vector``
+    tsvector column with a GIN index (added by the DDL hooks below), which
+    backs keyword search in ``controllers.search``.
+    """
+    __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    role = Column(String(20), nullable=False)
+    content = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ChatMessage(id={self.id}, conversation_id={self.conversation_id}, role={self.role})>"
+
+
+event.listen(
+    ChatMessage.__table__,
+    "after_create",
+    DDL(
+        "ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', content)) STORED"
+    ).execute_if(dialect="postgresql"),
+)
+event.listen(
+    ChatMessage.__table__,
+    "after_create",
+    DDL(
+        "CREATE INDEX IF NOT EXISTS ix_chat_messages_search_vector "
+        "ON chat_messages USING GIN (search_vector)"
+    ).execute_if(dialect="postgresql"),
+)
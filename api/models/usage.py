@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Date
+from sqlalchemy.dialects.postgresql import UUID
+
+from database.base import Base
+
+
+class Usage(Base):
+    """Per-minute token usage, one row per (user, model, minute).
+
+    On PostgreSQL the table is range-partitioned by ``bucket``; monthly
+    partitions are created by ``controllers.usage.ensure_usage_partitions``.
+    """
+    __tablename__ = "usage"
+    __table_args__ = {"postgresql_partition_by": "RANGE (bucket)"}
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    requests = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<Usage(user_id={self.user_id}, model={self.model}, bucket={self.bucket})>"
+
+
+class UsageDaily(Base):
+    """Daily rollup of ``usage`` maintained on every flush, read by the usage API."""
+    __tablename__ = "usage_daily"
+
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    model = Column(String(100), primary_key=True)
+    day = Column(Date, primary_key=True)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
+    requests = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<UsageDaily(user_id={self.user_id}, model={self.model}, day={self.day})>"
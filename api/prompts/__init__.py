@@ -0,0 +1,17 @@
+from .registry import PromptError, PromptRegistry, PromptTemplate, RenderedPrompt
+from .cache import PrefixCache
+from .library import TEMPLATES
+
+# Global instances; templates are compiled and validated at import, so a
+# broken template fails the worker at startup rather than on a request
+prompt_registry = PromptRegistry()
+for _template in TEMPLATES:
+    prompt_registry.register(_template)
+prompt_registry.validate()
+
+prefix_cache = PrefixCache()
+
+__all__ = [
+    "PromptError", "PromptRegistry", "PromptTemplate", "RenderedPrompt", "PrefixCache",
+    "prompt_registry", "prefix_cache",
+]
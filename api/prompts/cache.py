@@ -0,0 +1,114 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from providers.base import LLMProvider
+from utils.tokens import estimate_tokens
+
+PROMPT_CACHE_TTL = int(os.getenv("PROMPT_CACHE_TTL", "3600"))
+# Refresh a handle when it has less than this many seconds left
+PROMPT_CACHE_REFRESH_MARGIN = int(os.getenv("PROMPT_CACHE_REFRESH_MARGIN", "300"))
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str]  # provider name, model, prefix hash
+
+
+class CachedPrefix:
+    def __init__(self, handle: Optional[str], tokens: int, expires_at: float):
+        self.handle = handle  # None when the provider wouldn't cache this prefix
+        self.tokens = tokens
+        self.expires_at = expires_at
+
+
+class PrefixCache:
+    """Provider context-cache handles for stable prompt prefixes.
+
+    ``acquire`` returns the handle to send with a request, creating it on
+    first use and extending its TTL when it is about to expire, so hot
+    prefixes never lapse. Prefixes the provider refuses to cache (too
+    short, unsupported) are remembered for one TTL so they aren't retried
+    on every request.
+    """
+
+    def __init__(self, ttl: int = PROMPT_CACHE_TTL, refresh_margin: int = PROMPT_CACHE_REFRESH_MARGIN):
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self._entries: Dict[CacheKey, CachedPrefix] = {}
+        self._locks: Dict[CacheKey, asyncio.Lock] = {}
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.uncacheable = 0
+        self.prompt_tokens_saved = 0
+
+    def _key(self, provider: LLMProvider, prefix: str) -> CacheKey:
+        return provider.name, provider.model, hashlib.sha256(prefix.encode()).hexdigest()
+
+    async def acquire(self, provider: LLMProvider, prefix: str) -> Optional[str]:
+        """Cache handle for ``prefix`` on ``provider``, or ``None`` to send it inline"""
+        if not prefix:
+            return None
+        self.requests += 1
+        key = self._key(provider, prefix)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry.expires_at - now > self.refresh_margin:
+            return self._use(entry)
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another request may have created or refreshed it meanwhile
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry is not None and entry.expires_at - now > self.refresh_margin:
+                return self._use(entry)
+
+            if entry is not None and entry.handle is not None and entry.expires_at > now:
+                try:
+                    if await provider.refresh_cache(entry.handle, self.ttl):
+                        entry.expires_at = now + self.ttl
+                        self.refreshes += 1
+                        return self._use(entry)
+                except Exception as e:
+                    logger.warning("Refreshing prompt cache %s failed: %s", entry.handle, e)
+
+            try:
+                handle = await provider.create_cache(prefix, self.ttl)
+            except Exception as e:
+                logger.warning("Creating prompt cache failed: %s", e)
+                handle = None
+            entry = self._entries[key] = CachedPrefix(handle, estimate_tokens(prefix), now + self.ttl)
+            if handle is None:
+                self.uncacheable += 1
+            else:
+                self.misses += 1
+            return handle
+
+    def _use(self, entry: CachedPrefix) -> Optional[str]:
+        if entry.handle is None:
+            self.uncacheable += 1
+        else:
+            self.hits += 1
+            self.prompt_tokens_saved += entry.tokens
+        return entry.handle
+
+    def stats(self) -> dict:
+        cacheable = self.hits + self.misses
+        return {
+            "requests": self.requests,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "uncacheable": self.uncacheable,
+            "hit_ratio": round(self.hits / cacheable, 4) if cacheable else 0.0,
+            "prompt_tokens_saved": self.prompt_tokens_saved,
+            "handles": sum(1 for entry in self._entries.values() if entry.handle is not None),
+        }
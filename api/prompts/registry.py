@@ -0,0 +1,125 @@
+import os
+from string import Template
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+
+class PromptError(Exception):
+    """Raised for invalid templates and for rendering with missing variables"""
+
+
+class RenderedPrompt(NamedTuple):
+    key: str  # "name@version"
+    system: str  # stable prefix, identical for every render of this version
+    text: str
+
+
+class PromptTemplate:
+    """A versioned prompt: a static system prompt plus a per-request template.
+
+    ``system`` may only use placeholders bound by ``defaults`` and is
+    rendered once by ``compile``, so it is a stable prefix that providers
+    can cache. ``template`` must use exactly the placeholders listed in
+    ``variables``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        version: int,
+        system: str,
+        template: str,
+        variables: Tuple[str, ...] = (),
+        defaults: Optional[Mapping[str, str]] = None,
+    ):
+        self.name = name
+        self.version = version
+        self.system = system
+        self.template = template
+        self.variables = tuple(variables)
+        self.defaults = dict(defaults or {})
+        self.compiled_system: Optional[str] = None
+        self._compiled_template: Optional[Template] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.version}"
+
+    def compile(self) -> "PromptTemplate":
+        system = Template(self.system)
+        template = Template(self.template)
+        for label, compiled in (("system", system), ("template", template)):
+            if not compiled.is_valid():
+                raise PromptError(f"{self.key}: invalid placeholder in {label}")
+
+        unbound = set(system.get_identifiers()) - set(self.defaults)
+        if unbound:
+            raise PromptError(f"{self.key}: system prompt uses unbound placeholders {sorted(unbound)}")
+        used = set(template.get_identifiers())
+        if used != set(self.variables):
+            raise PromptError(
+                f"{self.key}: template placeholders {sorted(used)} don't match variables {sorted(self.variables)}"
+            )
+
+        self.compiled_system = system.substitute(self.defaults)
+        self._compiled_template = template
+        return self
+
+    def render(self, **variables: str) -> RenderedPrompt:
+        missing = set(self.variables) - set(variables)
+        if missing:
+            raise PromptError(f"{self.key}: missing variables {sorted(missing)}")
+        return RenderedPrompt(self.key, self.compiled_system, self._compiled_template.substitute(variables))
+
+
+def parse_pinned_versions(spec: str) -> Dict[str, int]:
+    """Parse ``"chat=1,summary=2"`` into a name -> version mapping"""
+    pinned = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, version = item.partition("=")
+        pinned[name.strip()] = int(version)
+    return pinned
+
+
+class PromptRegistry:
+    """Compiled prompt templates by name and version.
+
+    The active version of a template is the newest one unless pinned via
+    ``PROMPT_VERSIONS`` (e.g. ``chat=1``), so a new version can ship
+    before it is switched on.
+    """
+
+    def __init__(self, pinned: Optional[Dict[str, int]] = None):
+        self._templates: Dict[str, Dict[int, PromptTemplate]] = {}
+        if pinned is None:
+            pinned = parse_pinned_versions(os.getenv("PROMPT_VERSIONS", ""))
+        self.pinned = pinned
+
+    def register(self, template: PromptTemplate) -> PromptTemplate:
+        versions = self._templates.setdefault(template.name, {})
+        if template.version in versions:
+            raise PromptError(f"{template.key} is already registered")
+        versions[template.version] = template.compile()
+        return template
+
+    def get(self, name: str, version: Optional[int] = None) -> PromptTemplate:
+        versions = self._templates.get(name)
+        if not versions:
+            raise PromptError(f"Unknown prompt template {name!r}")
+        version = version or self.pinned.get(name) or max(versions)
+        if version not in versions:
+            raise PromptError(f"Unknown prompt template {name}@{version}")
+        return versions[version]
+
+    def render(self, name: str, version: Optional[int] = None, **variables: str) -> RenderedPrompt:
+        return self.get(name, version).render(**variables)
+
+    def validate(self) -> None:
+        """Check that every pinned version exists (call at startup)"""
+        for name, version in self.pinned.items():
+            self.get(name, version)
+
+    def active(self) -> List[PromptTemplate]:
+        return [self.get(name) for name in sorted(self._templates)]
+
+    def all(self) -> List[PromptTemplate]:
+        return [t for name in sorted(self._templates) for _, t in sorted(self._templates[name].items())]
@@ -0,0 +1,43 @@
+import os
+from typing import Optional
+
+from .base import LLMProvider, ProviderError
+from .fake import FakeProvider
+from .gemini import GeminiProvider
+
+_provider: Optional[LLMProvider] = None
+
+
+def get_provider() -> LLMProvider:
+    """Return the process-wide provider, configured from the environment.
+
+    ``LLM_PROVIDER`` selects ``gemini`` or ``fake``; it defaults to Gemini
+    when ``GOOGLE_GENERATIVE_AI_API_KEY`` is set and to the fake otherwise.
+    """
+    global _provider
+    if _provider is None:
+        api_key = os.getenv("GOOGLE_GENERATIVE_AI_API_KEY")
+        name = os.getenv("LLM_PROVIDER", "gemini" if api_key else "fake")
+        model = os.getenv("LLM_MODEL", "gemini-2.0-flash")
+        if name == "gemini":
+            if not api_key:
+                raise ProviderError("GOOGLE_GENERATIVE_AI_API_KEY is required for the gemini provider")
+            _provider = GeminiProvider(model, api_key)
+        else:
+            _provider = FakeProvider(model)
+    return _provider
+
+
+async def close_provider() -> None:
+    """Close the process-wide provider's connections, if one was created"""
+    if _provider is not None:
+        await _provider.aclose()
+
+
+def set_provider(provider: Optional[LLMProvider]) -> None:
+    """Replace the process-wide provider (used by tests)"""
+    global _provider
+    _provider = provider
+
+
+__all__ = ["LLMProvider", "ProviderError", "FakeProvider", "GeminiProvider", "get_provider", "set_provider", "close_provider"]
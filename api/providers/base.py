@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Optional
+
+
+class ProviderError(Exception):
+    """Raised when the upstream model provider fails"""
+
+
+class LLMProvider(ABC):
+    """Streaming text generation backend used by the chat transports"""
+
+    name: str = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @abstractmethod
+    def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        cached_content: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Yield generated text chunks for ``prompt``.
+
+        ``cached_content`` is a handle from ``create_cache`` holding
+        ``system``; when given, the system prompt is not sent again.
+        Implementations are async generators; closing the generator must
+        abort the upstream request.
+        """
+
+    async def create_cache(self, system: str, ttl: int) -> Optional[str]:
+        """Cache ``system`` upstream for ``ttl`` seconds and return its handle.
+
+        Returns ``None`` when the provider doesn't support context caching.
+        """
+        return None
+
+    async def refresh_cache(self, handle: str, ttl: int) -> bool:
+        """Extend a cache handle's TTL; ``False`` if it can't be extended"""
+        return False
+
+    async def aclose(self) -> None:
+        """Release any shared resources (HTTP clients, pools)"""
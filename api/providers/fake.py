@@ -0,0 +1,45 @@
+import asyncio
+from typing import AsyncIterator, Optional
+
+from .base import LLMProvider
+
+
+class FakeProvider(LLMProvider):
+    """Deterministic provider for tests and local development.
+
+    Echoes the prompt back word by word, optionally sleeping between chunks,
+    and counts how many chunks consumers actually pulled.
+    """
+
+    name = "fake"
+
+    def __init__(self, model: str = "fake", delay: float = 0.0, reply: Optional[str] = None):
+        super().__init__(model)
+        self.delay = delay
+        self.reply = reply
+        self.chunks_pulled = 0
+        self.cache_enabled = True
+        self.caches = {}
+
+    async def create_cache(self, system: str, ttl: int) -> Optional[str]:
+        if not self.cache_enabled:
+            return None
+        handle = f"cachedContents/fake-{len(self.caches)}"
+        self.caches[handle] = system
+        return handle
+
+    async def refresh_cache(self, handle: str, ttl: int) -> bool:
+        return handle in self.caches
+
+    async def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        cached_content: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        words = (self.reply or f"You said: {prompt}").split(" ")
+        for i, word in enumerate(words):
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            self.chunks_pulled += 1
+            yield word if i == 0 else f" {word}"
@@ -0,0 +1,89 @@
+import json
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from .base import LLMProvider, ProviderError
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta"
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini via the ``streamGenerateContent`` SSE endpoint"""
+
+    name = "gemini"
+
+    def __init__(self, model: str, api_key: str, timeout: float = 60.0):
+        super().__init__(model)
+        self.api_key = api_key
+        self._client: Optional[httpx.AsyncClient] = None
+        self._timeout = timeout
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(base_url=GEMINI_API_URL, timeout=self._timeout)
+        return self._client
+
+    async def create_cache(self, system: str, ttl: int) -> Optional[str]:
+        response = await self.client.post(
+            "/cachedContents",
+            headers={"x-goog-api-key": self.api_key},
+            json={
+                "model": f"models/{self.model}",
+                "systemInstruction": {"parts": [{"text": system}]},
+                "ttl": f"{ttl}s",
+            },
+        )
+        if response.status_code != 200:
+            # Most often the prefix is below the model's minimum cacheable size
+            return None
+        return response.json().get("name")
+
+    async def refresh_cache(self, handle: str, ttl: int) -> bool:
+        response = await self.client.patch(
+            f"/{handle}",
+            params={"updateMask": "ttl"},
+            headers={"x-goog-api-key": self.api_key},
+            json={"ttl": f"{ttl}s"},
+        )
+        return response.status_code == 200
+
+    async def stream(
+        self,
+        prompt: str,
+        system: Optional[str] = None,
+        cached_content: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        body = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        if cached_content:
+            body["cachedContent"] = cached_content
+        elif system:
+            body["systemInstruction"] = {"parts": [{"text": system}]}
+        async with self.client.stream(
+            "POST",
+            f"/models/{self.model}:streamGenerateContent",
+            params={"alt": "sse"},
+            headers={"x-goog-api-key": self.api_key},
+            json=body,
+        ) as response:
+            if response.status_code != 200:
+                detail = (await response.aread()).decode(errors="replace")
+                raise ProviderError(f"Gemini returned {response.status_code}: {detail[:200]}")
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    payload = json.loads(line[5:])
+                except ValueError:
+                    continue
+                for candidate in payload.get("candidates", []):
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
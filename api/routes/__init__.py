@@ -1,9 +1,14 @@
 from fastapi import APIRouter
-from . import home, auth, chat
+from . import home, auth, chat, usage, search, admin, prompts, cache
 
 api_router = APIRouter()
 api_router.include_router(home.router)
 api_router.include_router(auth.router)
 api_router.include_router(chat.router)
+api_router.include_router(usage.router)
+api_router.include_router(search.router)
+api_router.include_router(admin.router)
+api_router.include_router(prompts.router)
+api_router.include_router(cache.router)
 
 __all__ = ["api_router"]
\ No newline at end of file
@@ -0,0 +1,41 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from controllers.provisioning import provisioning_controller
+from schemas.admin import ImportResult
+from schemas.auth import TokenData
+from utils.jwt import require_admin
+from utils.serialization import json_response
+from database import get_db
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@router.post("/users/import", response_model=ImportResult)
+async def import_users(
+    request: Request,
+    admin: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Create users from an NDJSON or CSV body (email, username, password per row)"""
+    fmt = provisioning_controller.import_format(request.headers.get("content-type"))
+    result = await provisioning_controller.import_users(db, request.stream(), fmt)
+    return json_response(result)
+
+
+@router.get("/users/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    admin: TokenData = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Stream all users as NDJSON or CSV"""
+    return StreamingResponse(
+        provisioning_controller.export_users(db.get_bind(), format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=users.{format}"},
+    )
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
-from schemas.auth import UserCreate, UserLogin, UserResponse, Token, TokenRefresh
+from schemas.auth import (
+    UserCreate, UserLogin, UserResponse, Token, TokenRefresh, SessionResponse,
+    StreamTicket, StreamTicketVerifyRequest, StreamTicketStatus, StreamTicketVerifyResponse,
+)
 from controllers.auth import auth_controller
-from utils.jwt import get_current_user, verify_token
+from controllers.session import session_controller
+from utils.jwt import (
+    STREAM_TICKET_TTL, create_stream_ticket, get_current_user, verify_stream_ticket, verify_token,
+)
+from utils.serialization import json_response
 from schemas.auth import TokenData
-from database import get_db
+from database import get_db, use_primary
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -15,7 +24,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     try:
         user = auth_controller.create_user(db, user_data)
-        return user
+        return json_response(user, status_code=status.HTTP_201_CREATED)
     except HTTPException:
         raise
     except Exception as e:
@@ -26,11 +35,18 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, request: Request, db: Session = Depends(get_db)):
     """Login user and return JWT tokens"""
+    # A user who just registered may not have reached the replicas yet
+    use_primary(db)
     try:
-        token = auth_controller.login_user(db, login_data)
-        return token
+        token = auth_controller.login_user(
+            db,
+            login_data,
+            user_agent=request.headers.get("user-agent"),
+            ip_address=request.client.host if request.client else None,
+        )
+        return json_response(token)
     except HTTPException:
         raise
     except Exception as e:
@@ -45,9 +61,9 @@ async def refresh_token(token_data: TokenRefresh, db: Session = Depends(get_db))
     """Refresh access token using refresh token"""
     try:
         # Verify refresh token
-        verify_token(token_data.refresh_token, "refresh")
-        token = auth_controller.refresh_access_token(db, token_data.refresh_token)
-        return token
+        refresh = verify_token(token_data.refresh_token, "refresh")
+        token = auth_controller.refresh_access_token(db, token_data.refresh_token, refresh.session_id)
+        return json_response(token)
     except HTTPException:
         raise
     except Exception as e:
@@ -69,25 +85,84 @@ async def get_current_user_info(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return UserResponse(
-        id=user.id,
-        email=user.email,
-        username=user.username,
-        is_active=user.is_active,
-        created_at=user.created_at,
-        last_login=user.last_login
-    )
+    return json_response(UserResponse.model_validate(user))
 
 
 @router.post("/logout")
-async def logout(token_data: TokenRefresh):
-    """Logout user by invalidating refresh token"""
+async def logout(token_data: TokenRefresh, db: Session = Depends(get_db)):
+    """Logout user by invalidating refresh token and revoking its session"""
     try:
-        if token_data.refresh_token in auth_controller.refresh_tokens:
-            del auth_controller.refresh_tokens[token_data.refresh_token]
+        auth_controller.refresh_tokens.pop(token_data.refresh_token, None)
+        # Revoke whether or not this worker issued the token: the map above is
+        # empty after a restart and never holds other workers' tokens
+        refresh = verify_token(token_data.refresh_token, "refresh")
+        if refresh.session_id is not None:
+            session_controller.revoke_session(db, refresh.user_id, refresh.session_id)
+        return {"message": "Successfully logged out"}
+    except HTTPException:
+        # Expired or already revoked: nothing left to invalidate
         return {"message": "Successfully logged out"}
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Logout failed"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/logout-all")
+async def logout_all(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke every active session of the current user, including this one"""
+    revoked = session_controller.revoke_all(db, current_user.user_id)
+    auth_controller.revoke_refresh_tokens(current_user.user_id)
+    return {"message": "Logged out of all sessions", "revoked": revoked}
+
+
+@router.get("/sessions", response_model=List[SessionResponse])
+async def list_sessions(
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """List the current user's active sessions"""
+    sessions = [SessionResponse.model_validate(s) for s in session_controller.list_sessions(db, current_user.user_id)]
+    for session in sessions:
+        session.current = session.id == current_user.session_id
+    return json_response(sessions, model=List[SessionResponse])
+
+
+@router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_session(
+    session_id: UUID,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke one of the current user's sessions"""
+    if not session_controller.revoke_session(db, current_user.user_id, session_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/stream-ticket", response_model=StreamTicket)
+async def issue_stream_ticket(current_user: TokenData = Depends(get_current_user)):
+    """Issue a short-lived signed ticket that authorizes calls to the stream proxy"""
+    ticket, expires_at = create_stream_ticket(current_user.user_id, current_user.session_id)
+    return json_response(StreamTicket(ticket=ticket, expires_at=expires_at, expires_in=STREAM_TICKET_TTL))
+
+
+@router.post("/stream-ticket/verify", response_model=StreamTicketVerifyResponse)
+async def verify_stream_tickets(request: StreamTicketVerifyRequest):
+    """Check up to 100 stream tickets at once; results are in request order"""
+    results = []
+    for ticket in request.tickets:
+        try:
+            data = verify_stream_ticket(ticket)
+            results.append(StreamTicketStatus(valid=True, user_id=data.user_id, session_id=data.session_id))
+        except Exception:
+            # One malformed ticket must not fail the rest of the batch
+            results.append(StreamTicketStatus(valid=False))
+    return json_response(StreamTicketVerifyResponse(results=results))
@@ -0,0 +1,17 @@
+from typing import List
+from fastapi import APIRouter, Depends
+
+from cache import cache_manager
+from schemas.auth import TokenData
+from schemas.cache import CacheNamespaceStats
+from utils.jwt import get_current_user
+from utils.serialization import json_response
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("", response_model=List[CacheNamespaceStats])
+async def cache_stats(current_user: TokenData = Depends(get_current_user)):
+    """Per-namespace hit ratios and sizes for this worker's caches"""
+    stats = [CacheNamespaceStats(**namespace) for namespace in cache_manager.stats().values()]
+    return json_response(stats, model=List[CacheNamespaceStats])
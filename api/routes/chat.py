@@ -1,31 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, status
+from fastapi.responses import StreamingResponse
+from fastapi.security.utils import get_authorization_scheme_param
+from sqlalchemy.orm import Session
 import os
 
-from utils.jwt import get_current_user
+from utils.jwt import get_current_user, verify_token_with_expiry
+from utils.tokens import estimate_tokens, estimate_tokens_many
 from schemas.auth import TokenData
+from schemas.chat import ChatRequest, StreamRequest, ChatResponse, StreamResponse
+from utils.serialization import json_response
+from controllers.usage import usage_meter
+from controllers.conversation import conversation_controller
+from controllers.websocket import ChatConnection
+from controllers.streaming import generation_slots, stream_reply, stream_until_disconnect
+from controllers.drain import drain_controller
+from providers import get_provider
+from database import get_db
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
+LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash")
 
-class Message(BaseModel):
-    role: str
-    content: str
 
-
-class ChatRequest(BaseModel):
-    messages: List[Message]
-
-
-class StreamRequest(BaseModel):
-    prompt: str
-
-
-@router.post("/")
+@router.post("/", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Protected chat endpoint - requires authentication"""
     try:
@@ -35,13 +36,28 @@ async def chat(
                 detail="Please provide messages for the chat."
             )
         
+        last_message = request.messages[-1].content
+        conversation = conversation_controller.get_or_create_conversation(
+            db, current_user.user_id, request.conversation_id, title=last_message
+        )
+
         # Here you would integrate with your AI service
         # For now, return a simple response
-        return {
-            "message": f"Chat response for user {current_user.email}",
-            "user_id": str(current_user.user_id),
-            "messages_received": len(request.messages)
-        }
+        message = f"Chat response for user {current_user.email}"
+        usage_meter.record(
+            current_user.user_id,
+            LLM_MODEL,
+            prompt_tokens=estimate_tokens_many(m.content for m in request.messages),
+            completion_tokens=estimate_tokens(message),
+        )
+        conversation_controller.add_turn(db, conversation, last_message, message)
+
+        return json_response(ChatResponse(
+            message=message,
+            user_id=current_user.user_id,
+            conversation_id=conversation.id,
+            messages_received=len(request.messages)
+        ))
         
     except HTTPException:
         raise
@@ -52,10 +68,11 @@ async def chat(
         )
 
 
-@router.post("/stream")
+@router.post("/stream", response_model=StreamResponse)
 async def stream(
     request: StreamRequest,
-    current_user: TokenData = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
 ):
     """Protected stream endpoint - requires authentication"""
     try:
@@ -65,13 +82,28 @@ async def stream(
                 detail="Please provide a valid prompt for text generation."
             )
         
+        prompt = request.prompt.strip()
+        conversation = conversation_controller.get_or_create_conversation(
+            db, current_user.user_id, request.conversation_id, title=prompt
+        )
+
         # Here you would integrate with your streaming AI service
         # For now, return a simple response
-        return {
-            "message": f"Stream response for user {current_user.email}",
-            "user_id": str(current_user.user_id),
-            "prompt": request.prompt.strip()
-        }
+        message = f"Stream response for user {current_user.email}"
+        usage_meter.record(
+            current_user.user_id,
+            LLM_MODEL,
+            prompt_tokens=estimate_tokens(prompt),
+            completion_tokens=estimate_tokens(message),
+        )
+        conversation_controller.add_turn(db, conversation, prompt, message)
+
+        return json_response(StreamResponse(
+            message=message,
+            user_id=current_user.user_id,
+            conversation_id=conversation.id,
+            prompt=prompt
+        ))
         
     except HTTPException:
         raise
@@ -79,4 +111,97 @@ async def stream(
         raise HTTPException(
             status_code=500,
             detail="Failed to process stream request"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/generate")
+async def generate(
+    request: StreamRequest,
+    raw_request: Request,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Stream generated text as it arrives, aborting upstream when the client disconnects"""
+    if not request.prompt or not request.prompt.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Please provide a valid prompt for text generation."
+        )
+    drain_controller.check_accepting()
+    if generation_slots.locked():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent generations, please retry shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    prompt = request.prompt.strip()
+    try:
+        conversation = conversation_controller.get_or_create_conversation(
+            db, current_user.user_id, request.conversation_id, title=prompt
+        )
+        conversation_id = conversation.id
+        db.commit()
+    finally:
+        # Don't hold a pooled connection for the lifetime of the stream
+        db.close()
+
+    provider = get_provider()
+
+    async def body():
+        parts = []
+        try:
+            with drain_controller.track():
+                async with generation_slots:
+                    async for chunk in stream_until_disconnect(raw_request, stream_reply(provider, prompt)):
+                        parts.append(chunk)
+                        yield chunk
+        finally:
+            reply = "".join(parts)
+            usage_meter.record(
+                current_user.user_id,
+                provider.model,
+                prompt_tokens=estimate_tokens(prompt),
+                completion_tokens=estimate_tokens(reply),
+            )
+            if not getattr(raw_request.state, "disconnected", False):
+                try:
+                    conversation = conversation_controller.get_conversation(db, current_user.user_id, conversation_id)
+                    if conversation:
+                        conversation_controller.add_turn(db, conversation, prompt, reply)
+                finally:
+                    db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/plain; charset=utf-8",
+        headers={"X-Conversation-Id": str(conversation_id)},
+    )
+
+
+@router.websocket("/ws")
+async def chat_ws(websocket: WebSocket, db: Session = Depends(get_db)):
+    """Multiplexed chat streams over one WebSocket.
+
+    Authenticates with an access token passed as ``?token=`` (browsers) or
+    an ``Authorization: Bearer`` header; every new stream re-checks that its
+    session hasn't been revoked and the token hasn't expired.
+    """
+    if drain_controller.draining:
+        await websocket.close(code=status.WS_1012_SERVICE_RESTART)
+        return
+
+    token = websocket.query_params.get("token")
+    if not token:
+        scheme, token = get_authorization_scheme_param(websocket.headers.get("authorization"))
+        if scheme.lower() != "bearer":
+            token = None
+
+    try:
+        current_user, expires_at = verify_token_with_expiry(token or "", "access")
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await ChatConnection(websocket, current_user, get_provider(), db, expires_at).serve()
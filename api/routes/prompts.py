@@ -0,0 +1,34 @@
+from typing import List
+from fastapi import APIRouter, Depends
+
+from prompts import prefix_cache, prompt_registry
+from schemas.auth import TokenData
+from schemas.prompts import PromptCacheStats, PromptInfo
+from utils.jwt import get_current_user
+from utils.serialization import json_response
+from utils.tokens import estimate_tokens
+
+router = APIRouter(prefix="/prompts", tags=["prompts"])
+
+
+@router.get("", response_model=List[PromptInfo])
+async def list_prompts(current_user: TokenData = Depends(get_current_user)):
+    """Registered prompt templates and which version of each is active"""
+    active = {template.key for template in prompt_registry.active()}
+    templates = [
+        PromptInfo(
+            name=template.name,
+            version=template.version,
+            active=template.key in active,
+            variables=list(template.variables),
+            system_tokens=estimate_tokens(template.compiled_system),
+        )
+        for template in prompt_registry.all()
+    ]
+    return json_response(templates, model=List[PromptInfo])
+
+
+@router.get("/cache", response_model=PromptCacheStats)
+async def prompt_cache_stats(current_user: TokenData = Depends(get_current_user)):
+    """Hit ratio and prompt tokens served from provider context caches"""
+    return json_response(PromptCacheStats(**prefix_cache.stats()))
@@ -0,0 +1,25 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from controllers.search import search_controller, SEARCH_MODES
+from schemas.auth import TokenData
+from schemas.search import SearchResponse
+from utils.jwt import get_current_user
+from utils.serialization import json_response
+from database import get_db
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResponse)
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=500),
+    mode: Optional[str] = Query(None, pattern="^(" + "|".join(SEARCH_MODES) + ")$"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Search the current user's chat history"""
+    return json_response(search_controller.search(db, current_user.user_id, q, mode, limit, cursor))
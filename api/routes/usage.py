@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from controllers.usage import usage_meter
+from schemas.auth import TokenData
+from schemas.usage import UsageSummary
+from utils.jwt import get_current_user
+from utils.serialization import json_response
+from database import get_db
+
+router = APIRouter(prefix="/usage", tags=["usage"])
+
+
+@router.get("", response_model=UsageSummary)
+async def get_usage(
+    days: int = Query(30, ge=1, le=366),
+    current_user: TokenData = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Daily token usage rollups for the current user"""
+    return json_response(usage_meter.get_daily_usage(db, current_user.user_id, days))
@@ -1,3 +1,18 @@
-from .auth import UserCreate, UserLogin, UserResponse, Token, TokenData, TokenRefresh
+from .auth import (
+    UserCreate, UserLogin, UserResponse, Token, TokenData, TokenRefresh, SessionResponse,
+    StreamTicket, StreamTicketVerifyRequest, StreamTicketStatus, StreamTicketVerifyResponse,
+)
+from .usage import UsageDay, UsageSummary
+from .search import SearchHit, SearchResponse
+from .chat import Message, ChatRequest, StreamRequest, ChatResponse, StreamResponse
+from .admin import ImportRowError, ImportResult
+from .prompts import PromptInfo, PromptCacheStats
+from .cache import CacheNamespaceStats
 
-__all__ = ["UserCreate", "UserLogin", "UserResponse", "Token", "TokenData", "TokenRefresh"]
\ No newline at end of file
+__all__ = [
+    "UserCreate", "UserLogin", "UserResponse", "Token", "TokenData", "TokenRefresh", "SessionResponse",
+    "StreamTicket", "StreamTicketVerifyRequest", "StreamTicketStatus", "StreamTicketVerifyResponse",
+    "UsageDay", "UsageSummary", "SearchHit", "SearchResponse",
+    "Message", "ChatRequest", "StreamRequest", "ChatResponse", "StreamResponse",
+    "ImportRowError", "ImportResult", "PromptInfo", "PromptCacheStats", "CacheNamespaceStats",
+]
@@ -0,0 +1,15 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+
+class ImportResult(BaseModel):
+    created: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, EmailStr, Field
 from uuid import UUID
 
@@ -37,7 +37,40 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     user_id: Optional[UUID] = None
     email: Optional[str] = None
+    session_id: Optional[UUID] = None
 
 
 class TokenRefresh(BaseModel):
-    refresh_token: str
\ No newline at end of file
+    refresh_token: str
+
+
+class SessionResponse(BaseModel):
+    id: UUID
+    user_agent: Optional[str] = None
+    ip_address: Optional[str] = None
+    created_at: datetime
+    expires_at: datetime
+    current: bool = False
+
+    class Config:
+        from_attributes = True
+
+
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_at: int
+    expires_in: int
+
+
+class StreamTicketVerifyRequest(BaseModel):
+    tickets: List[str] = Field(min_length=1, max_length=100)
+
+
+class StreamTicketStatus(BaseModel):
+    valid: bool
+    user_id: Optional[UUID] = None
+    session_id: Optional[UUID] = None
+
+
+class StreamTicketVerifyResponse(BaseModel):
+    results: List[StreamTicketStatus]
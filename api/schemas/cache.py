@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+
+
+class CacheNamespaceStats(BaseModel):
+    namespace: str
+    size: int
+    l1_hits: int
+    l2_hits: int
+    coalesced: int
+    misses: int
+    hit_ratio: float
+    evictions: int
+    invalidations: int
+    remote_invalidations: int
+    l2_errors: int
@@ -0,0 +1,32 @@
+from typing import List, Optional
+from pydantic import BaseModel
+from uuid import UUID
+
+
+class Message(BaseModel):
+    role: str
+    content: str
+
+
+class ChatRequest(BaseModel):
+    messages: List[Message]
+    conversation_id: Optional[UUID] = None
+
+
+class StreamRequest(BaseModel):
+    prompt: str
+    conversation_id: Optional[UUID] = None
+
+
+class ChatResponse(BaseModel):
+    message: str
+    user_id: UUID
+    conversation_id: UUID
+    messages_received: int
+
+
+class StreamResponse(BaseModel):
+    message: str
+    user_id: UUID
+    conversation_id: UUID
+    prompt: str
@@ -0,0 +1,21 @@
+from typing import List
+from pydantic import BaseModel
+
+
+class PromptInfo(BaseModel):
+    name: str
+    version: int
+    active: bool
+    variables: List[str]
+    system_tokens: int
+
+
+class PromptCacheStats(BaseModel):
+    requests: int
+    hits: int
+    misses: int
+    refreshes: int
+    uncacheable: int
+    hit_ratio: float
+    prompt_tokens_saved: int
+    handles: int
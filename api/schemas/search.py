@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+from uuid import UUID
+
+
+class SearchHit(BaseModel):
+    id: int
+    conversation_id: UUID
+    role: str
+    content: str
+    created_at: datetime
+    score: float
+
+
+class SearchResponse(BaseModel):
+    mode: str
+    items: List[SearchHit]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,22 @@
+from datetime import date
+from typing import List
+from pydantic import BaseModel
+from uuid import UUID
+
+
+class UsageDay(BaseModel):
+    day: date
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    requests: int
+
+
+class UsageSummary(BaseModel):
+    user_id: UUID
+    since: date
+    days: List[UsageDay]
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
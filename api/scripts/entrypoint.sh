@@ -16,15 +16,24 @@ echo "✅ Database connected"
 # Create tables on startup (fast path)
 echo "📊 Ensuring database schema..."
 python -c "
+import logging
+from utils.log import setup_logging
+setup_logging()
+logger = logging.getLogger('entrypoint')
 try:
     from database.base import Base
     from database.connection import engine
     from models.user import User
+    from models.usage import Usage, UsageDaily
+    from models.conversation import Conversation, ChatMessage
+    from models.session import UserSession
+    from controllers.usage import ensure_usage_partitions
     Base.metadata.create_all(bind=engine)
-    print('✅ Database schema ready')
+    ensure_usage_partitions(engine)
+    logger.info('Database schema ready')
 except Exception as e:
-    print(f'⚠️  Schema creation warning: {e}')
-" 2>/dev/null || echo "⚠️  Schema creation skipped"
+    logger.warning('Schema creation warning: %s', e)
+" || echo "⚠️  Schema creation skipped"
 
 echo "🎯 Starting server..."
 exec "$@"
\ No newline at end of file
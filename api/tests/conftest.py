@@ -1,46 +1,103 @@
 import pytest
 import os
+
+# The app's startup hooks would otherwise reach for the real DATABASE_URL
+os.environ.setdefault("BACKGROUND_SERVICES", "false")
+
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from passlib.context import CryptContext
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
+from cache import cache_manager
+from controllers.auth import auth_controller
 from database.base import Base
 from database.connection import get_db
 
-# Test database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# One in-memory database per xdist worker ("main" when running without -n)
+WORKER = os.getenv("PYTEST_XDIST_WORKER", "main")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///file:test_{WORKER}?mode=memory&cache=shared&uri=true"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False)
+
+# Minimum bcrypt cost, for the test process only; production hashes stay at BCRYPT_ROUNDS
+auth_controller.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=4)
+
+
+# pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN itself
+# (see "Serializable isolation / Savepoints / Transactional DDL" in the SQLAlchemy SQLite docs)
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine, "begin")
+def _begin(conn):
+    conn.exec_driver_sql("BEGIN")
 
 
-def override_get_db():
+@pytest.fixture(scope="session")
+def connection():
+    """One connection and schema for the whole session"""
+    Base.metadata.create_all(bind=engine)
+    conn = engine.connect()
     try:
-        db = TestingSessionLocal()
-        yield db
+        yield conn
     finally:
-        db.close()
+        conn.close()
+        Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture(scope="function")
-def db_session():
-    Base.metadata.create_all(bind=engine)
-    db = TestingSessionLocal()
+def transaction(connection):
+    """Outer transaction rolled back after each test.
+
+    Sessions join it through a SAVEPOINT, so their commits and rollbacks
+    behave normally but nothing outlives the test.
+    """
+    outer = connection.begin()
+    try:
+        yield connection
+    finally:
+        outer.rollback()
+
+
+def _session(connection):
+    return TestingSessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Cached rows must not outlive the transaction they were read in"""
+    yield
+    cache_manager.clear()
+
+
+@pytest.fixture(scope="function")
+def db_session(transaction):
+    db = _session(transaction)
     try:
         yield db
     finally:
         db.close()
-        Base.metadata.drop_all(bind=engine)
 
 
 @pytest.fixture(scope="function")
-def client(db_session):
+def client(transaction):
+    def override_get_db():
+        db = _session(transaction)
+        try:
+            yield db
+        finally:
+            db.close()
+
     app.dependency_overrides[get_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
@@ -61,4 +118,4 @@ def test_login_data():
     return {
         "email": "test@example.com",
         "password": "testpassword123"
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import pytest
+from fastapi import status
+
+from controllers.provisioning import MAX_LINE_BYTES, _iter_lines, provisioning_controller
+from utils import jwt as jwt_utils
+
+
+@pytest.fixture
+def admin_headers(client, test_user_data, test_login_data, monkeypatch):
+    monkeypatch.setattr(jwt_utils, "ADMIN_EMAILS", {test_user_data["email"]})
+    monkeypatch.setattr(provisioning_controller, "hash_workers", 2)
+    client.post("/api/v1/auth/register", json=test_user_data)
+    token = client.post("/api/v1/auth/login", json=test_login_data).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestBulkImport:
+    def test_import_ndjson_reports_row_errors(self, client, admin_headers, test_user_data):
+        """Test that valid rows are created and bad rows are reported by row number"""
+        body = "\n".join([
+            json.dumps({"email": "a@example.com", "username": "alice", "password": "password123"}),
+            json.dumps({"email": "not-an-email", "username": "bob", "password": "password123"}),
+            "{broken",
+            json.dumps({"email": "a@example.com", "username": "again", "password": "password123"}),
+            json.dumps({"email": test_user_data["email"], "username": "taken", "password": "password123"}),
+            json.dumps({"email": "c@example.com", "username": "carol", "password": "password123"}),
+        ])
+        response = client.post(
+            "/api/v1/admin/users/import",
+            content=body,
+            headers={**admin_headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["created"] == 2
+        assert result["failed"] == 4
+        assert [(e["row"], e["error"].split(":")[0]) for e in result["errors"]] == [
+            (2, "email"),
+            (3, "Invalid JSON"),
+            (4, "Duplicate email in upload"),
+            (5, "Email already registered"),
+        ]
+
+        login = client.post("/api/v1/auth/login", json={"email": "c@example.com", "password": "password123"})
+        assert login.status_code == status.HTTP_200_OK
+
+    def test_import_csv(self, client, admin_headers):
+        """Test CSV uploads with a header row"""
+        body = "email,username,password\nd@example.com,dave,password123\ne@example.com,erin,short\n"
+        response = client.post(
+            "/api/v1/admin/users/import",
+            content=body,
+            headers={**admin_headers, "Content-Type": "text/csv"},
+        )
+        result = response.json()
+        assert result["created"] == 1
+        assert result["errors"][0]["row"] == 2
+
+    def test_undecodable_and_overlong_lines_are_row_errors(self, client, admin_headers):
+        """Test that invalid UTF-8 and over-long lines are reported per row instead of failing the upload"""
+        good = json.dumps({"email": "f@example.com", "username": "frank", "password": "password123"}).encode()
+        body = b"\n".join([b'{"email": "\xff"}', b"x" * (MAX_LINE_BYTES + 1), good])
+        response = client.post(
+            "/api/v1/admin/users/import",
+            content=body,
+            headers={**admin_headers, "Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        result = response.json()
+        assert result["created"] == 1
+        assert [(e["row"], e["error"]) for e in result["errors"]] == [
+            (1, "Invalid UTF-8"),
+            (2, f"Line longer than {MAX_LINE_BYTES} bytes"),
+        ]
+
+    def test_undecodable_csv_header(self, client, admin_headers):
+        """Test that a CSV upload whose header can't be read is rejected"""
+        response = client.post(
+            "/api/v1/admin/users/import",
+            content=b"email,\xffname\n",
+            headers={**admin_headers, "Content-Type": "text/csv"},
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_overlong_line_is_not_buffered(self):
+        """Test that the tail of an over-long line is skipped chunk by chunk"""
+        async def chunks():
+            yield b"ok\n" + b"x" * 6
+            for _ in range(100):
+                yield b"x" * 6
+            yield b"x\nnext\n"
+
+        async def collect():
+            return [line if isinstance(line, str) else str(line) async for line in _iter_lines(chunks(), 8)]
+
+        assert asyncio.run(collect()) == ["ok", "Line longer than 8 bytes", "next"]
+
+    def test_unsupported_content_type(self, client, admin_headers):
+        """Test that unknown upload formats are rejected"""
+        response = client.post(
+            "/api/v1/admin/users/import",
+            content="<users/>",
+            headers={**admin_headers, "Content-Type": "application/xml"},
+        )
+        assert response.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+
+    def test_requires_admin(self, client, test_user_data, test_login_data):
+        """Test that regular users can't use admin endpoints"""
+        client.post("/api/v1/auth/register", json=test_user_data)
+        token = client.post("/api/v1/auth/login", json=test_login_data).json()["access_token"]
+        response = client.get("/api/v1/admin/users/export", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+class TestExport:
+    def test_export_ndjson(self, client, admin_headers, test_user_data):
+        """Test that every user is streamed without password hashes"""
+        response = client.get("/api/v1/admin/users/export", headers=admin_headers)
+        assert response.status_code == status.HTTP_200_OK
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert [row["email"] for row in rows] == [test_user_data["email"]]
+        assert "hashed_password" not in rows[0]
+
+    def test_export_csv(self, client, admin_headers, test_user_data):
+        """Test CSV export has a header and one line per user"""
+        response = client.get("/api/v1/admin/users/export?format=csv", headers=admin_headers)
+        lines = response.text.splitlines()
+        assert lines[0] == "id,email,username,is_active,created_at,last_login"
+        assert len(lines) == 2
+        assert test_user_data["email"] in lines[1]
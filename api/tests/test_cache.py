@@ -0,0 +1,150 @@
+import threading
+import time
+import pytest
+from datetime import datetime
+from uuid import uuid4
+from fastapi import status
+
+from cache import CacheManager, FakeBackend, LocalCache, OrmCodec, cache_manager
+from cache.local import MISSING
+from models.conversation import Conversation
+
+
+class FailingBackend(FakeBackend):
+    def get(self, key):
+        raise ConnectionError("redis is down")
+
+
+def login(client, user_data):
+    client.post("/api/v1/auth/register", json=user_data)
+    response = client.post("/api/v1/auth/login", json={"email": user_data["email"], "password": user_data["password"]})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+class TestLocalCache:
+    def test_expiry_and_lru_eviction(self):
+        """Test that entries expire and the least recently used entry is evicted first"""
+        local = LocalCache(max_size=2, ttl=60)
+        local.set("a", 1)
+        local.set("b", 2)
+        local.get("a")
+        local.set("c", 3)
+        assert local.get("b") is MISSING and local.get("a") == 1 and local.get("c") == 3
+        assert local.evictions == 1
+
+        local.set("d", 4, ttl=0.01)
+        time.sleep(0.02)
+        assert local.get("d") is MISSING
+
+
+class TestCacheNamespace:
+    def test_concurrent_misses_load_once(self):
+        """Test that a stampede on one key runs the loader once and the rest wait for it"""
+        namespace = CacheManager().namespace("stampede")
+        calls = []
+        barrier = threading.Barrier(8)
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return {"value": 42}
+
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(namespace.get_or_load("key", loader))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 8
+        stats = namespace.stats()
+        assert stats["misses"] == 1 and stats["coalesced"] == 7 and stats["hit_ratio"] == 0.875
+
+    def test_shared_l2_and_invalidation_across_workers(self):
+        """Test that a second worker reads the L2 and drops its L1 copy when the first invalidates"""
+        backend = FakeBackend()
+        first, second = CacheManager(backend), CacheManager(backend)
+        for manager in (first, second):
+            manager.start()
+        users_a, users_b = first.namespace("users"), second.namespace("users")
+
+        assert users_a.get_or_load("1", lambda: {"name": "old"}) == {"name": "old"}
+        assert users_b.get_or_load("1", lambda: pytest.fail("should come from L2")) == {"name": "old"}
+        assert users_b.stats()["l2_hits"] == 1
+
+        users_a.invalidate("1")
+        assert users_b.stats()["remote_invalidations"] == 1
+        assert users_b.get_or_load("1", lambda: {"name": "new"}) == {"name": "new"}
+
+    def test_l2_outage_falls_back_to_loader(self):
+        """Test that an unreachable L2 is counted and bypassed rather than failing the request"""
+        namespace = CacheManager(FailingBackend()).namespace("flaky")
+        assert namespace.get_or_load("k", lambda: [1]) == [1]
+        assert namespace.stats()["l2_errors"] == 1
+
+    def test_none_is_not_cached(self):
+        """Test that a missing row is looked up again next time"""
+        namespace = CacheManager().namespace("missing")
+        namespace.get_or_load("k", lambda: None)
+        assert namespace.get_or_load("k", lambda: "created") == "created"
+
+
+class TestOrmCodec:
+    def test_round_trip_restores_types_without_a_query(self, db_session):
+        """Test that a JSON-cached row comes back with UUIDs and datetimes, attached to the session"""
+        codec = OrmCodec(Conversation)
+        conversation = Conversation(id=uuid4(), user_id=uuid4(), title="hello", created_at=datetime(2025, 1, 2, 3, 4, 5))
+        data = codec.loads(codec.dumps(codec.snapshot(conversation)))
+        assert data["id"] == conversation.id and data["created_at"] == conversation.created_at
+
+        restored = codec.restore(db_session, data)
+        assert restored in db_session
+        assert restored.title == "hello"
+
+
+class TestCachedLookups:
+    def test_me_is_served_from_cache_and_login_invalidates(self, client, test_user_data):
+        """Test the users namespace on /auth/me and that a new login refreshes last_login"""
+        headers = login(client, test_user_data)
+        first = client.get("/api/v1/auth/me", headers=headers).json()
+        client.get("/api/v1/auth/me", headers=headers)
+        assert cache_manager.namespaces["users"].stats()["l1_hits"] == 1
+
+        login(client, test_user_data)
+        again = client.get("/api/v1/auth/me", headers=headers).json()
+        assert again["last_login"] != first["last_login"]
+
+    def test_cached_conversation_is_not_shared_across_users(self, client, test_user_data):
+        """Test that conversation metadata cached for one user is not visible to another"""
+        owner = login(client, test_user_data)
+        response = client.post("/api/v1/chat/", json={"messages": [{"role": "user", "content": "hi"}]}, headers=owner)
+        conversation_id = response.json()["conversation_id"]
+        reply = client.post(
+            "/api/v1/chat/",
+            json={"messages": [{"role": "user", "content": "again"}], "conversation_id": conversation_id},
+            headers=owner,
+        )
+        assert reply.status_code == status.HTTP_200_OK
+
+        other = login(client, {**test_user_data, "email": "other@example.com"})
+        response = client.post(
+            "/api/v1/chat/",
+            json={"messages": [{"role": "user", "content": "hi"}], "conversation_id": conversation_id},
+            headers=other,
+        )
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_stats_endpoint(self, client, test_user_data):
+        """Test that per-namespace metrics are exposed"""
+        headers = login(client, test_user_data)
+        response = client.get("/api/v1/cache", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        namespaces = {item["namespace"]: item for item in response.json()}
+        assert {"users", "tokens", "conversations"} <= set(namespaces)
+        assert namespaces["tokens"]["misses"] >= 1
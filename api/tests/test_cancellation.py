@@ -0,0 +1,107 @@
+import asyncio
+import json
+import pytest
+from uuid import uuid4
+
+from main import app
+from controllers.streaming import generation_slots, GENERATION_CONCURRENCY
+from providers import FakeProvider, set_provider
+from utils.jwt import create_access_token
+
+
+class CountingProvider(FakeProvider):
+    """Fake provider that also tracks open upstream streams"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.open_streams = 0
+
+    async def stream(self, prompt, **kwargs):
+        self.open_streams += 1
+        try:
+            async for chunk in super().stream(prompt, **kwargs):
+                yield chunk
+        finally:
+            self.open_streams -= 1
+
+
+@pytest.fixture
+def provider():
+    fake = CountingProvider(delay=0.01, reply=" ".join(["token"] * 200))
+    set_provider(fake)
+    yield fake
+    set_provider(None)
+
+
+async def _call(path, payload, disconnect_after_chunks=None):
+    """Drive the ASGI app directly so the client can vanish mid-stream"""
+    token = create_access_token(data={"sub": str(uuid4()), "email": "test@example.com"})
+    disconnected = asyncio.Event()
+    request_sent = False
+    messages = []
+    chunks = 0
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": json.dumps(payload).encode(), "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal chunks
+        messages.append(message)
+        if message["type"] == "http.response.body" and message.get("body"):
+            chunks += 1
+            if disconnect_after_chunks is not None and chunks >= disconnect_after_chunks:
+                disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"authorization", f"Bearer {token}".encode()),
+        ],
+        "client": ("testclient", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=10)
+    return messages
+
+
+class TestCancellation:
+    def test_full_stream(self, client, provider):
+        """Test that a connected client receives the whole generation"""
+        provider.reply = "one two three"
+        messages = asyncio.run(_call("/api/v1/chat/generate", {"prompt": "hi"}))
+
+        assert messages[0]["status"] == 200
+        body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+        assert body.decode() == "one two three"
+
+    def test_disconnect_stops_upstream(self, client, provider):
+        """Test that no tokens are pulled after the client disconnects"""
+
+        async def scenario():
+            await _call("/api/v1/chat/generate", {"prompt": "hi"}, disconnect_after_chunks=3)
+            pulled = provider.chunks_pulled
+            # Give a runaway generator time to keep pulling if it were still alive
+            await asyncio.sleep(0.1)
+            return pulled
+
+        pulled = asyncio.run(scenario())
+
+        assert pulled < 10
+        assert provider.chunks_pulled == pulled
+        assert provider.open_streams == 0
+        assert generation_slots._value == GENERATION_CONCURRENCY
@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+from fastapi import status
+
+from middleware.concurrency_limit import DEFAULT_PRIORITIES, ConcurrencyLimitMiddleware, parse_priorities
+from utils.limiter import AIMDLimit, ConcurrencyLimiter, Priority
+
+
+class TestAIMDLimit:
+    def test_backs_off_once_per_round_trip(self):
+        """Test that a burst of slow samples from the same round only shrinks the limit once"""
+        limit = AIMDLimit(initial=100, backoff=0.5, ratio_smoothing=1.0, slack=0)
+        limit.update("/r", 0.0, 0.01, inflight=10)
+        for _ in range(5):
+            limit.update("/r", 0.0, 1.0, inflight=10)
+        assert limit.limit == 50
+        # Admitted after the decrease and still slow: back off again
+        limit.update("/r", 1.5, 2.5, inflight=10)
+        assert limit.limit == 25
+
+    def test_grows_only_when_in_use(self):
+        """Test additive increase while at least half the limit is in flight"""
+        limit = AIMDLimit(initial=10)
+        for _ in range(50):
+            limit.update("/r", 0.0, 0.01, inflight=1)
+        assert limit.limit == 10
+        for _ in range(50):
+            limit.update("/r", 0.0, 0.01, inflight=8)
+        assert limit.limit > 10
+
+    def test_failures_shrink_to_the_floor(self):
+        """Test that failed requests back off regardless of latency but never below min_limit"""
+        limit = AIMDLimit(initial=20, min_limit=8, backoff=0.5)
+        for step in range(10):
+            limit.update("/r", float(step), step + 0.01, inflight=1, dropped=True)
+        assert limit.limit == 8
+
+
+class TestConcurrencyLimiter:
+    def test_low_priority_is_shed_first(self):
+        """Test that chat streams are shed before auth refreshes and probes never are"""
+        limiter = ConcurrencyLimiter(AIMDLimit(initial=10, min_limit=1))
+        while limiter.try_acquire(Priority.LOW):
+            pass
+        assert limiter.inflight == 7
+        assert limiter.try_acquire(Priority.HIGH)
+        assert limiter.try_acquire(Priority.NORMAL)
+        while limiter.try_acquire(Priority.HIGH):
+            pass
+        assert limiter.inflight == 10
+        assert limiter.try_acquire(Priority.CRITICAL)
+        stats = limiter.stats()
+        assert stats["shed"]["low"] == 1 and stats["shed"]["high"] == 1 and stats["shed"]["critical"] == 0
+
+    def test_priority_rules(self):
+        """Test that the longest matching prefix picks the class"""
+        middleware = ConcurrencyLimitMiddleware(None, priorities=parse_priorities(DEFAULT_PRIORITIES))
+        assert middleware.priority("/health") == Priority.CRITICAL
+        assert middleware.priority("/api/v1/auth/refresh") == Priority.HIGH
+        assert middleware.priority("/api/v1/auth/me") == Priority.NORMAL
+        assert middleware.priority("/api/v1/chat/generate") == Priority.LOW
+
+
+class TestConcurrencyLimitMiddleware:
+    def test_sheds_with_503_when_full(self):
+        """Test that requests over the limit get 503 + Retry-After and the slot frees at response start"""
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await release.wait()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        limiter = ConcurrencyLimiter(AIMDLimit(initial=1, min_limit=1))
+        middleware = ConcurrencyLimitMiddleware(app, limiter=limiter, priorities={})
+
+        async def call():
+            messages = []
+
+            async def receive():
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                messages.append(message)
+
+            await middleware({"type": "http", "method": "GET", "path": "/x", "headers": []}, receive, send)
+            return messages
+
+        async def run():
+            first = asyncio.create_task(call())
+            await asyncio.sleep(0)
+            shed = await call()
+            release.set()
+            return shed, await first
+
+        shed, served = asyncio.run(run())
+        assert shed[0]["status"] == 503
+        assert (b"retry-after", b"1") in shed[0]["headers"]
+        assert served[0]["status"] == 200
+        assert limiter.inflight == 0
+
+    def test_503s_are_neutral(self):
+        """Test that shed and 503 responses leave the limit alone while other 5xx shrink it"""
+        status_code = 503
+        gate = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/slow":
+                await gate.wait()
+            await send({"type": "http.response.start", "status": status_code, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        limiter = ConcurrencyLimiter(AIMDLimit(initial=10, min_limit=1))
+        middleware = ConcurrencyLimitMiddleware(app, limiter=limiter, priorities={})
+
+        async def call(path="/x"):
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+
+            await middleware({"type": "http", "method": "GET", "path": path, "headers": []}, None, send)
+            return messages[0]["status"]
+
+        async def run():
+            # fill the normal share (9 of 10), then get shed
+            held = [asyncio.create_task(call("/slow")) for _ in range(9)]
+            await asyncio.sleep(0)
+            shed = [await call() for _ in range(20)]
+            gate.set()
+            await asyncio.gather(*held)
+            return shed
+
+        assert asyncio.run(run()) == [503] * 20
+        assert limiter.shed[Priority.NORMAL] == 20
+        for _ in range(20):
+            asyncio.run(call())
+        assert limiter.limit.limit == 10
+
+        status_code = 500
+        asyncio.run(call())
+        assert limiter.limit.limit < 10
+        assert limiter.inflight == 0
+
+    def test_readiness_reports_limiter(self, client):
+        """Test that /readyz exposes the current limit and shed counts"""
+        response = client.get("/readyz")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["concurrency"]["limit"] >= 1
@@ -0,0 +1,154 @@
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import pytest
+import httpx
+from uuid import uuid4
+from fastapi import status
+
+from controllers.drain import DrainController, drain_controller
+from utils.jwt import SECRET_KEY, create_access_token
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPLY_WORDS = 60
+
+SERVER = """
+import sys, uvicorn
+from providers import FakeProvider, set_provider
+set_provider(FakeProvider(delay=0.02, reply=" ".join(f"w{i}" for i in range(%d))))
+from main import app
+uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+""" % REPLY_WORDS
+
+
+class TestDrainController:
+    def test_readyz_reports_draining(self, client):
+        """Test that readiness flips to 503 while draining"""
+        assert client.get("/readyz").status_code == status.HTTP_200_OK
+        drain_controller.draining = True
+        drain_controller.deadline = time.monotonic() + 10
+        try:
+            response = client.get("/readyz")
+            assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+            assert response.json()["status"] == "draining"
+        finally:
+            drain_controller.reset()
+
+    def test_new_streams_are_refused_while_draining(self, client):
+        """Test that generation requests get 503 with Retry-After during a drain"""
+        token = create_access_token(data={"sub": str(uuid4()), "email": "test@example.com"})
+        drain_controller.draining = True
+        try:
+            response = client.post(
+                "/api/v1/chat/generate",
+                json={"prompt": "hello"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        finally:
+            drain_controller.reset()
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["retry-after"]
+
+    def test_drain_waits_then_cancels_at_deadline(self):
+        """Test that finished streams are waited for and stragglers are cancelled"""
+        controller = DrainController(timeout=0.3)
+
+        async def stream(seconds):
+            with controller.track():
+                await asyncio.sleep(seconds)
+
+        async def run():
+            fast = asyncio.create_task(stream(0.05))
+            slow = asyncio.create_task(stream(5))
+            await asyncio.sleep(0)
+            assert controller.active == 2
+            cancelled = await controller.drain()
+            await asyncio.gather(fast, slow, return_exceptions=True)
+            return cancelled, fast.cancelled(), slow.cancelled()
+
+        assert asyncio.run(run()) == (1, False, True)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, env: dict) -> subprocess.Popen:
+    process = subprocess.Popen([sys.executable, "-c", SERVER, str(port)], cwd=API_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/readyz").status_code == 200:
+                return process
+        except httpx.TransportError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("server did not start")
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGTERM")
+class TestRestartUnderLoad:
+    def test_restart_does_not_truncate_streams(self, tmp_path):
+        """Test a SIGTERM restart while streams are in flight: all complete, new ones wait for the next worker"""
+        port = free_port()
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{tmp_path / 'drain.db'}",
+            "SECRET_KEY": SECRET_KEY,
+            "DRAIN_TIMEOUT": "20",
+            "BACKGROUND_SERVICES": "true",
+            "LOG_LEVEL": "WARNING",
+            "SEMANTIC_SEARCH": "false",
+        }
+        token = create_access_token(data={"sub": str(uuid4()), "email": "test@example.com"})
+        headers = {"Authorization": f"Bearer {token}"}
+        expected = " ".join(f"w{i}" for i in range(REPLY_WORDS))
+        base = f"http://127.0.0.1:{port}"
+
+        async def stream(client, started):
+            async with client.stream("POST", "/api/v1/chat/generate", json={"prompt": "hi"}, headers=headers) as response:
+                assert response.status_code == 200
+                parts = []
+                async for chunk in response.aiter_text():
+                    parts.append(chunk)
+                    started.set()
+                return "".join(parts)
+
+        async def load(process):
+            async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+                events = [asyncio.Event() for _ in range(8)]
+                streams = [asyncio.create_task(stream(client, event)) for event in events]
+                await asyncio.wait_for(asyncio.gather(*(e.wait() for e in events)), 10)
+
+                process.send_signal(signal.SIGTERM)
+                await asyncio.sleep(0.2)
+                ready = await client.get("/readyz")
+                refused = await client.post("/api/v1/chat/generate", json={"prompt": "hi"}, headers=headers)
+                return await asyncio.gather(*streams), ready, refused
+
+        process = start_server(port, env)
+        try:
+            replies, ready, refused = asyncio.run(load(process))
+            process.wait(timeout=30)
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+        assert replies == [expected] * 8
+        assert ready.status_code == 503 and ready.json()["status"] == "draining"
+        assert refused.status_code == 503
+
+        # The replacement worker serves streams normally
+        process = start_server(port, env)
+        try:
+            response = httpx.post(f"{base}/api/v1/chat/generate", json={"prompt": "hi"}, headers=headers, timeout=30)
+            assert response.text == expected
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
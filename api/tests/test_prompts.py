@@ -0,0 +1,116 @@
+import asyncio
+import pytest
+from fastapi import status
+
+from prompts import PrefixCache, PromptError, PromptRegistry, PromptTemplate, prefix_cache
+from providers import FakeProvider, set_provider
+
+
+def template(version=1, system="You help with $topic.", text="$message", variables=("message",)):
+    return PromptTemplate("test", version, system, text, variables, defaults={"topic": "tests"})
+
+
+class TestPromptRegistry:
+    def test_system_prompt_is_compiled_once(self):
+        """Test that static placeholders are bound at registration"""
+        registry = PromptRegistry(pinned={})
+        registry.register(template())
+        rendered = registry.render("test", message="hi")
+        assert rendered == ("test@1", "You help with tests.", "hi")
+
+    @pytest.mark.parametrize("kwargs", [
+        {"system": "You help with $unknown."},
+        {"text": "$message $extra"},
+        {"text": "$"},
+    ])
+    def test_invalid_templates_fail_registration(self, kwargs):
+        """Test that bad placeholders are caught before any request"""
+        with pytest.raises(PromptError):
+            PromptRegistry(pinned={}).register(template(**kwargs))
+
+    def test_missing_variable(self):
+        """Test that rendering without a declared variable fails"""
+        registry = PromptRegistry(pinned={})
+        registry.register(template())
+        with pytest.raises(PromptError):
+            registry.render("test")
+
+    def test_latest_version_unless_pinned(self):
+        """Test version selection"""
+        for pinned, expected in (({}, "test@2"), ({"test": 1}, "test@1")):
+            registry = PromptRegistry(pinned=pinned)
+            registry.register(template(version=1))
+            registry.register(template(version=2, system="Version two."))
+            assert registry.get("test").key == expected
+
+        registry = PromptRegistry(pinned={"test": 3})
+        registry.register(template())
+        with pytest.raises(PromptError):
+            registry.validate()
+
+
+class TestPrefixCache:
+    def test_hits_refreshes_and_savings(self):
+        """Test that repeated prefixes reuse a handle and it is refreshed near expiry"""
+        provider = FakeProvider()
+        cache = PrefixCache(ttl=100, refresh_margin=10)
+        prefix = "x" * 400
+
+        async def run():
+            first = await cache.acquire(provider, prefix)
+            second = await cache.acquire(provider, prefix)
+            assert first == second is not None
+            # Pretend the handle is about to expire
+            next(iter(cache._entries.values())).expires_at -= 95
+            assert await cache.acquire(provider, prefix) == first
+
+        asyncio.run(run())
+        stats = cache.stats()
+        assert (stats["misses"], stats["hits"], stats["refreshes"]) == (1, 2, 1)
+        assert stats["hit_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+        assert stats["prompt_tokens_saved"] == 200
+        assert len(provider.caches) == 1
+
+    def test_uncacheable_prefix_is_not_retried(self):
+        """Test that a refused prefix is sent inline without asking again"""
+        provider = FakeProvider()
+        provider.cache_enabled = False
+        cache = PrefixCache()
+
+        async def run():
+            return [await cache.acquire(provider, "short") for _ in range(3)]
+
+        assert asyncio.run(run()) == [None, None, None]
+        assert cache.stats()["uncacheable"] == 3
+        assert cache.stats()["hit_ratio"] == 0.0
+
+
+class TestPromptRoutes:
+    @pytest.fixture
+    def headers(self, client, test_user_data, test_login_data):
+        client.post("/api/v1/auth/register", json=test_user_data)
+        token = client.post("/api/v1/auth/login", json=test_login_data).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_generation_uses_cached_prefix(self, client, headers):
+        """Test that chat generations share one cached system prompt"""
+        provider = FakeProvider()
+        set_provider(provider)
+        prefix_cache.reset_stats()
+        try:
+            for _ in range(3):
+                response = client.post("/api/v1/chat/generate", json={"prompt": "hello"}, headers=headers)
+                assert response.text == "You said: hello"
+        finally:
+            set_provider(None)
+
+        stats = client.get("/api/v1/prompts/cache", headers=headers).json()
+        assert stats["requests"] == 3
+        assert stats["hits"] >= 2
+        assert stats["prompt_tokens_saved"] > 0
+
+    def test_list_prompts(self, client, headers):
+        """Test that the built-in chat template is listed as active"""
+        response = client.get("/api/v1/prompts", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        assert {"name": "chat", "version": 1, "active": True}.items() <= response.json()[0].items()
@@ -0,0 +1,137 @@
+import pytest
+from uuid import uuid4
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database.base import Base
+from database.routing import ReplicaSet, RoutingSession, WriteTracker, use_primary
+from models.conversation import Conversation
+
+
+def sqlite_engine(path):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = sqlite_engine(tmp_path / "primary.db")
+    replica = sqlite_engine(tmp_path / "replica.db")
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def make_factory(primary, replica_engines, window=60.0):
+    return sessionmaker(
+        class_=RoutingSession,
+        primary=primary,
+        replicas=ReplicaSet(replica_engines, cooldown=60.0),
+        writes=WriteTracker(window=window),
+        bind=primary,
+    )
+
+
+def titles(session):
+    return [c.title for c in session.query(Conversation).order_by(Conversation.title)]
+
+
+class TestRoutingSession:
+    def test_writes_go_to_primary_and_reads_to_replica(self, databases):
+        """Test that a fresh session reads from the replica, which hasn't seen the write"""
+        primary, replica = databases
+        factory = make_factory(primary, [replica])
+
+        with factory() as db:
+            db.add(Conversation(user_id=uuid4(), title="primary only"))
+            db.commit()
+            # The session wrote, so its own reads stay on the primary
+            assert titles(db) == ["primary only"]
+
+        with factory() as db:
+            assert titles(db) == []
+            use_primary(db)
+            assert titles(db) == ["primary only"]
+
+    def test_read_your_writes_after_commit(self, databases):
+        """Test that a user's later sessions read from the primary right after their write"""
+        primary, replica = databases
+        factory = make_factory(primary, [replica])
+        writer, other = uuid4(), uuid4()
+
+        with factory() as db:
+            db.info["user_id"] = writer
+            db.add(Conversation(user_id=writer, title="mine"))
+            db.commit()
+
+        with factory() as db:
+            db.info["user_id"] = writer
+            assert titles(db) == ["mine"]
+
+        with factory() as db:
+            db.info["user_id"] = other
+            assert titles(db) == []
+
+    def test_stickiness_expires(self, databases):
+        """Test that reads return to the replica after the window"""
+        primary, replica = databases
+        factory = make_factory(primary, [replica], window=0.0)
+        user_id = uuid4()
+
+        with factory() as db:
+            db.info["user_id"] = user_id
+            db.add(Conversation(user_id=user_id, title="mine"))
+            db.commit()
+
+        with factory() as db:
+            db.info["user_id"] = user_id
+            assert titles(db) == []
+
+
+class TestReplicaSet:
+    def test_round_robin(self, tmp_path, databases):
+        """Test that reads alternate between replicas"""
+        primary, first = databases
+        second = sqlite_engine(tmp_path / "second.db")
+        for engine, title in ((first, "first"), (second, "second")):
+            with sessionmaker(bind=engine)() as db:
+                db.add(Conversation(user_id=uuid4(), title=title))
+                db.commit()
+
+        factory = make_factory(primary, [first, second])
+        seen = []
+        for _ in range(4):
+            with factory() as db:
+                seen.extend(titles(db))
+        assert seen == ["first", "second", "first", "second"]
+        second.dispose()
+
+    def test_failed_replica_is_excluded(self, tmp_path, databases):
+        """Test that a replica that can't connect is skipped until its cooldown passes"""
+        primary, replica = databases
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'broken.db'}")
+        factory = make_factory(primary, [broken, replica])
+        replicas = factory.kw["replicas"]
+
+        with factory() as db:
+            with pytest.raises(OperationalError):
+                titles(db)
+        assert replicas.healthy() == [replica]
+
+        for _ in range(3):
+            with factory() as db:
+                assert titles(db) == []
+
+    def test_all_replicas_down_falls_back_to_primary(self, databases):
+        """Test that reads use the primary when no replica is healthy"""
+        primary, replica = databases
+        factory = make_factory(primary, [replica])
+        factory.kw["replicas"].mark_down(replica)
+
+        with sessionmaker(bind=primary)() as db:
+            db.add(Conversation(user_id=uuid4(), title="primary"))
+            db.commit()
+        with factory() as db:
+            assert titles(db) == ["primary"]
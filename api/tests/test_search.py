@@ -0,0 +1,186 @@
+import pytest
+from uuid import uuid4
+from fastapi import status
+from sqlalchemy import select
+
+from controllers.search import search_controller, encode_cursor, decode_cursor
+from models.conversation import ChatMessage
+
+np = pytest.importorskip("numpy")
+
+from utils.embeddings import EmbeddingIndex, HashingEmbedder
+
+
+@pytest.fixture
+def fresh_index():
+    """Give each test an empty in-memory semantic index"""
+    original = search_controller.index
+    search_controller.index = EmbeddingIndex(search_controller.embedder.dim) if original is not None else None
+    yield search_controller.index
+    search_controller.index = original
+
+
+def _login(client, email, username="testuser", password="testpassword123"):
+    client.post("/api/v1/auth/register", json={"email": email, "username": username, "password": password})
+    login_response = client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    return {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+
+class TestEmbeddingIndex:
+    def test_search_is_isolated_per_owner(self):
+        """Test that vectors of other owners are never returned"""
+        embedder = HashingEmbedder(64)
+        index = EmbeddingIndex(64)
+        alice, bob = uuid4(), uuid4()
+        index.add([1, 2], [alice, bob], embedder.embed(["postgres tuning", "postgres tuning"]))
+
+        hits = index.search(alice, embedder.embed(["postgres tuning"])[0], limit=10)
+        assert [message_id for message_id, _ in hits] == [1]
+
+    def test_pagination_has_no_gaps_or_duplicates(self):
+        """Test that keyset pagination walks every vector exactly once"""
+        rng = np.random.default_rng(0)
+        index = EmbeddingIndex(16)
+        owner = uuid4()
+        vectors = rng.normal(size=(50, 16)).astype(np.float32)
+        vectors[10:20] = vectors[0]  # force score ties
+        index.add(list(range(50)), [owner] * 50, vectors)
+
+        seen, after = [], None
+        while True:
+            hits = index.search(owner, vectors[0], limit=7, after=after)
+            if not hits:
+                break
+            seen.extend(message_id for message_id, _ in hits)
+            after = (hits[-1][1], hits[-1][0])
+
+        assert sorted(seen) == list(range(50))
+
+    def test_interleaved_adds_and_searches(self):
+        """Test that growing the in-memory buffers keeps every row and earlier results intact"""
+        rng = np.random.default_rng(1)
+        index = EmbeddingIndex(16)
+        owner = uuid4()
+        vectors = rng.normal(size=(3000, 16)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        first = None
+        for start in range(0, 3000, 100):
+            index.add(list(range(start, start + 100)), [owner] * 100, vectors[start:start + 100])
+            hits = index.search(owner, vectors[0], limit=1)
+            first = first or hits
+            assert hits[0][0] == 0
+
+        assert len(index) == 3000
+        assert index._buffers["ids"].shape[0] < 2 * 3000 + 1024
+        assert index.search(owner, vectors[2999], limit=1)[0][0] == 2999
+        assert first == index.search(owner, vectors[0], limit=1)
+
+    def test_mmap_index_survives_reopen(self, tmp_path):
+        """Test that an on-disk index is readable by a new instance"""
+        embedder = HashingEmbedder(32)
+        owner = uuid4()
+        index = EmbeddingIndex(32, str(tmp_path))
+        index.add([7, 8], [owner, owner], embedder.embed(["hello world", "goodbye moon"]))
+
+        reopened = EmbeddingIndex(32, str(tmp_path))
+        assert len(reopened) == 2
+        hits = reopened.search(owner, embedder.embed(["hello world"])[0], limit=1)
+        assert hits[0][0] == 7
+
+
+class TestSearchAPI:
+    def test_keyword_search(self, client, fresh_index):
+        """Test that stored chat messages can be found by keyword"""
+        headers = _login(client, "test@example.com")
+        for prompt in ["How do I tune postgres?", "Tell me a joke", "Postgres vacuum settings"]:
+            client.post("/api/v1/chat/stream", json={"prompt": prompt}, headers=headers)
+
+        response = client.get("/api/v1/search", params={"q": "postgres", "mode": "keyword"}, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        contents = [hit["content"] for hit in response.json()["items"]]
+        assert contents == ["Postgres vacuum settings", "How do I tune postgres?"]
+
+    def test_search_is_isolated_per_user(self, client, fresh_index):
+        """Test that users only see their own messages"""
+        alice = _login(client, "alice@example.com", "alice")
+        bob = _login(client, "bob@example.com", "bob")
+        client.post("/api/v1/chat/stream", json={"prompt": "secret plans"}, headers=alice)
+
+        for mode in ("keyword", "hybrid"):
+            response = client.get("/api/v1/search", params={"q": "secret plans", "mode": mode}, headers=bob)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["items"] == []
+
+    def test_cursor_pagination(self, client, fresh_index):
+        """Test that following next_cursor returns every match once"""
+        headers = _login(client, "test@example.com")
+        for i in range(5):
+            client.post("/api/v1/chat/stream", json={"prompt": f"note number {i}"}, headers=headers)
+
+        ids, cursor = [], None
+        while True:
+            params = {"q": "note", "mode": "keyword", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            data = client.get("/api/v1/search", params=params, headers=headers).json()
+            ids.extend(hit["id"] for hit in data["items"])
+            cursor = data["next_cursor"]
+            if not cursor:
+                break
+
+        assert len(ids) == 5
+        assert len(set(ids)) == 5
+
+    def test_hybrid_search(self, client, fresh_index):
+        """Test that hybrid mode returns semantic and keyword matches"""
+        headers = _login(client, "test@example.com")
+        client.post("/api/v1/chat/stream", json={"prompt": "database index tuning"}, headers=headers)
+
+        response = client.get("/api/v1/search", params={"q": "index tuning"}, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["mode"] == "hybrid"
+        assert data["items"][0]["content"] == "database index tuning"
+
+    def test_rebuild_index(self, client, db_session, fresh_index):
+        """Test that a rebuild loads stored messages and that a stopped rebuild returns early"""
+        headers = _login(client, "test@example.com")
+        for i in range(3):
+            client.post("/api/v1/chat/stream", json={"prompt": f"note number {i}"}, headers=headers)
+        stored = len(fresh_index)
+
+        search_controller.index = EmbeddingIndex(search_controller.embedder.dim)
+        search_controller.stop_rebuild()
+        try:
+            assert search_controller.rebuild_index(db_session, batch_size=1) == 0
+        finally:
+            search_controller._stop_rebuild.clear()
+
+        assert search_controller.rebuild_index(db_session) == stored
+        assert len(search_controller.index) == stored
+
+    def test_rebuild_after_an_early_write(self, client, db_session, fresh_index):
+        """Test that a message indexed before the rebuild neither hides the history nor gets indexed twice"""
+        headers = _login(client, "test@example.com")
+        for i in range(3):
+            client.post("/api/v1/chat/stream", json={"prompt": f"note number {i}"}, headers=headers)
+        stored = db_session.scalars(select(ChatMessage).order_by(ChatMessage.id)).all()
+
+        search_controller.index = EmbeddingIndex(search_controller.embedder.dim)
+        search_controller.index_messages(stored[-1:])
+        assert search_controller.rebuild_index(db_session, batch_size=2) == len(stored) - 1
+
+        ids = search_controller.index._load()["ids"]
+        assert sorted(ids.tolist()) == [m.id for m in stored]
+        assert search_controller.rebuild_index(db_session) == 0
+
+    def test_invalid_cursor(self, client):
+        """Test that a malformed cursor is rejected"""
+        headers = _login(client, "test@example.com")
+        response = client.get("/api/v1/search", params={"q": "x", "cursor": "not-a-cursor"}, headers=headers)
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_cursor_round_trip(self):
+        """Test cursor encoding"""
+        assert decode_cursor(encode_cursor(0.25, 42)) == (0.25, 42)
@@ -0,0 +1,55 @@
+import json
+import pytest
+from datetime import datetime
+from uuid import uuid4
+from fastapi import status
+
+from schemas.auth import Token, UserResponse
+from utils.serialization import ADAPTERS, json_response
+
+
+class TestJSONResponse:
+    def test_matches_model_dump(self):
+        """Test that the fast path produces the same JSON as pydantic"""
+        user = UserResponse(
+            id=uuid4(), email="a@example.com", username="alice",
+            is_active=True, created_at=datetime(2025, 1, 1, 12, 0),
+        )
+        response = json_response(user, status_code=status.HTTP_201_CREATED)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == user.model_dump(mode="json")
+
+    def test_adapters_are_precompiled(self):
+        """Test that response models have adapters before the first request"""
+        assert Token in ADAPTERS
+        assert UserResponse in ADAPTERS
+
+
+class TestSerializedRoutes:
+    def test_register_and_me_payloads(self, client, test_user_data, test_login_data):
+        """Test that auth routes return the documented response shapes"""
+        response = client.post("/api/v1/auth/register", json=test_user_data)
+        assert response.status_code == status.HTTP_201_CREATED
+        assert set(response.json()) == set(UserResponse.model_fields)
+
+        token = client.post("/api/v1/auth/login", json=test_login_data).json()
+        assert set(token) == set(Token.model_fields)
+
+        response = client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token['access_token']}"})
+        assert response.headers["content-type"] == "application/json"
+        assert response.json()["email"] == test_user_data["email"]
+
+    def test_chat_payload(self, client, test_user_data, test_login_data):
+        """Test that chat responses serialize ids as strings"""
+        client.post("/api/v1/auth/register", json=test_user_data)
+        token = client.post("/api/v1/auth/login", json=test_login_data).json()["access_token"]
+        response = client.post(
+            "/api/v1/chat/",
+            json={"messages": [{"role": "user", "content": "hello"}]},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        body = response.json()
+        assert body["messages_received"] == 1
+        assert isinstance(body["conversation_id"], str)
@@ -0,0 +1,138 @@
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+from fastapi import status
+from sqlalchemy import event
+
+from controllers.auth import auth_controller
+from controllers.session import SessionController
+from models.session import UserSession
+from utils.denylist import SessionDenylist, session_denylist
+
+
+@pytest.fixture(autouse=True)
+def clear_denylist():
+    session_denylist.clear()
+    yield
+    session_denylist.clear()
+
+
+def login(client, test_user_data, test_login_data, user_agent="pytest"):
+    client.post("/api/v1/auth/register", json=test_user_data)
+    response = client.post("/api/v1/auth/login", json=test_login_data, headers={"User-Agent": user_agent})
+    return response.json()
+
+
+def auth(tokens):
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
+class TestSessionDenylist:
+    def test_add_and_prune(self):
+        """Test that expired revocations are forgotten"""
+        denylist = SessionDenylist()
+        now = datetime.utcnow()
+        live, stale = str(uuid4()), str(uuid4())
+        denylist.add([(live, now + timedelta(days=1)), (stale, now - timedelta(seconds=1))])
+        assert denylist.is_revoked(live) and denylist.is_revoked(stale)
+
+        assert denylist.prune(now) == 1
+        assert denylist.is_revoked(live)
+        assert not denylist.is_revoked(stale)
+
+    def test_sync_picks_up_other_workers(self, db_session):
+        """Test that revocations written elsewhere reach the denylist on sync"""
+        session = UserSession(user_id=uuid4(), expires_at=datetime.utcnow() + timedelta(days=1))
+        db_session.add(session)
+        db_session.commit()
+
+        controller = SessionController()
+        assert controller.sync(db_session) == 0
+        assert not session_denylist.is_revoked(str(session.id))
+
+        session.revoked_at = datetime.utcnow()
+        db_session.commit()
+        assert controller.sync(db_session) == 1
+        assert session_denylist.is_revoked(str(session.id))
+
+    def test_revoke_all_does_not_reload_each_session(self, db_session):
+        """Test that revoking many sessions costs no per-session SELECT after the commit"""
+        user_id = uuid4()
+        expires_at = datetime.utcnow() + timedelta(days=1)
+        db_session.add_all([UserSession(user_id=user_id, expires_at=expires_at) for _ in range(5)])
+        db_session.commit()
+
+        controller = SessionController()
+        sessions = controller.list_sessions(db_session, user_id)
+        session_ids = [str(session.id) for session in sessions]
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+        try:
+            assert controller._revoke(db_session, sessions) == 5
+        finally:
+            event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+        assert not [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        assert all(session_denylist.is_revoked(session_id) for session_id in session_ids)
+
+
+class TestSessionAPI:
+    def test_list_sessions(self, client, test_user_data, test_login_data):
+        """Test that each login shows up as a session and the caller's is marked"""
+        first = login(client, test_user_data, test_login_data, user_agent="laptop")
+        client.post("/api/v1/auth/login", json=test_login_data, headers={"User-Agent": "phone"})
+
+        response = client.get("/api/v1/auth/sessions", headers=auth(first))
+        assert response.status_code == status.HTTP_200_OK
+        sessions = response.json()
+        assert len(sessions) == 2
+        assert [s["user_agent"] for s in sessions if s["current"]] == ["laptop"]
+
+    def test_revoke_session_rejects_its_tokens(self, client, test_user_data, test_login_data):
+        """Test that revoking a session invalidates its access token immediately"""
+        tokens = login(client, test_user_data, test_login_data)
+        other = client.post("/api/v1/auth/login", json=test_login_data).json()
+        sessions = client.get("/api/v1/auth/sessions", headers=auth(other)).json()
+        target = next(s["id"] for s in sessions if not s["current"])
+
+        response = client.delete(f"/api/v1/auth/sessions/{target}", headers=auth(other))
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+        assert client.get("/api/v1/auth/me", headers=auth(tokens)).status_code == status.HTTP_401_UNAUTHORIZED
+        refresh = client.post("/api/v1/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+        assert refresh.status_code == status.HTTP_401_UNAUTHORIZED
+        assert client.get("/api/v1/auth/me", headers=auth(other)).status_code == status.HTTP_200_OK
+
+    def test_revoke_unknown_session(self, client, test_user_data, test_login_data):
+        """Test that revoking a session the user doesn't own returns 404"""
+        tokens = login(client, test_user_data, test_login_data)
+        response = client.delete(f"/api/v1/auth/sessions/{uuid4()}", headers=auth(tokens))
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_logout_revokes_access_token(self, client, test_user_data, test_login_data):
+        """Test that logout also invalidates the session's access token"""
+        tokens = login(client, test_user_data, test_login_data)
+        client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+        assert client.get("/api/v1/auth/me", headers=auth(tokens)).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_logout_without_the_issuing_worker(self, client, test_user_data, test_login_data):
+        """Test that logout revokes the session even when this worker never saw the refresh token"""
+        tokens = login(client, test_user_data, test_login_data)
+        auth_controller.refresh_tokens.clear()
+
+        response = client.post("/api/v1/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+        assert response.status_code == status.HTTP_200_OK
+        assert client.get("/api/v1/auth/me", headers=auth(tokens)).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_logout_all(self, client, test_user_data, test_login_data):
+        """Test that logging out everywhere revokes every session"""
+        first = login(client, test_user_data, test_login_data)
+        second = client.post("/api/v1/auth/login", json=test_login_data).json()
+
+        response = client.post("/api/v1/auth/logout-all", headers=auth(second))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["revoked"] == 2
+
+        for tokens in (first, second):
+            assert client.get("/api/v1/auth/me", headers=auth(tokens)).status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,77 @@
+import pytest
+from uuid import uuid4
+from fastapi import HTTPException, status
+
+from utils import jwt as jwt_utils
+from utils.denylist import session_denylist
+from utils.jwt import create_stream_ticket, verify_stream_ticket
+
+
+class TestStreamTickets:
+    def test_roundtrip(self):
+        """Test that a ticket verifies to the user and session it was issued for"""
+        user_id, session_id = uuid4(), uuid4()
+        ticket, _ = create_stream_ticket(user_id, session_id)
+        data = verify_stream_ticket(ticket)
+        assert (data.user_id, data.session_id) == (user_id, session_id)
+
+    def test_tampered_ticket(self):
+        """Test that changing the payload breaks the signature"""
+        ticket, _ = create_stream_ticket(uuid4())
+        payload, signature = ticket.split(".")
+        other, _ = create_stream_ticket(uuid4())
+        for bad in (f"{other.split('.')[0]}.{signature}", payload, "", "a.b.c"):
+            with pytest.raises(HTTPException):
+                verify_stream_ticket(bad)
+
+    def test_garbage_tickets(self):
+        """Test that non-ASCII and well-signed but malformed tickets are rejected, not crashed on"""
+        signed = [f"{payload}.{jwt_utils._sign_ticket(payload)}" for payload in ("_w", "djE6eA", "!!!")]
+        for bad in ["abc.é", "é", "\ud800.x", f"é.{signed[0]}", *signed]:
+            with pytest.raises(HTTPException):
+                verify_stream_ticket(bad)
+
+    def test_expired_ticket(self, monkeypatch):
+        """Test that tickets stop working after their TTL"""
+        monkeypatch.setattr(jwt_utils, "STREAM_TICKET_TTL", -1)
+        ticket, _ = create_stream_ticket(uuid4())
+        with pytest.raises(HTTPException):
+            verify_stream_ticket(ticket)
+
+    def test_revoked_session(self):
+        """Test that revoking the session invalidates its tickets"""
+        session_id = uuid4()
+        ticket, expires_at = create_stream_ticket(uuid4(), session_id)
+        session_denylist.add([(session_id, expires_at)])
+        try:
+            with pytest.raises(HTTPException):
+                verify_stream_ticket(ticket)
+        finally:
+            session_denylist.clear()
+
+
+class TestStreamTicketAPI:
+    def test_issue_and_batch_verify(self, client, test_user_data, test_login_data):
+        """Test issuing a ticket and verifying it alongside invalid ones"""
+        client.post("/api/v1/auth/register", json=test_user_data)
+        token = client.post("/api/v1/auth/login", json=test_login_data).json()["access_token"]
+
+        response = client.post("/api/v1/auth/stream-ticket", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == status.HTTP_200_OK
+        ticket = response.json()["ticket"]
+
+        response = client.post("/api/v1/auth/stream-ticket/verify", json={"tickets": [ticket, "bogus", ticket + "x", "abc.é", "é" + ticket]})
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()["results"]
+        assert [r["valid"] for r in results] == [True, False, False, False, False]
+        assert results[0]["user_id"] is not None
+
+    def test_issue_requires_login(self, client):
+        """Test that tickets are only issued to authenticated users"""
+        response = client.post("/api/v1/auth/stream-ticket")
+        assert response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN)
+
+    def test_batch_size_limit(self, client):
+        """Test that oversized batches are rejected"""
+        response = client.post("/api/v1/auth/stream-ticket/verify", json={"tickets": ["x"] * 101})
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,81 @@
+import pytest
+from datetime import datetime
+from uuid import uuid4
+from fastapi import status
+
+from controllers.usage import UsageMeter, usage_meter
+from models.usage import Usage, UsageDaily
+
+
+class TestUsageMeter:
+    def test_record_aggregates_per_minute(self, db_session):
+        """Test that records in the same minute collapse into one row"""
+        meter = UsageMeter()
+        user_id = uuid4()
+        at = datetime(2025, 1, 1, 12, 30, 15)
+
+        meter.record(user_id, "test-model", 10, 20, at=at)
+        meter.record(user_id, "test-model", 5, 5, at=at.replace(second=45))
+        meter.record(user_id, "test-model", 1, 1, at=at.replace(minute=31))
+        assert meter.pending == 2
+
+        assert meter.flush(db_session) == 2
+        assert meter.pending == 0
+
+        rows = db_session.query(Usage).order_by(Usage.bucket).all()
+        assert [(r.prompt_tokens, r.completion_tokens, r.requests) for r in rows] == [
+            (15, 25, 2),
+            (1, 1, 1),
+        ]
+
+        daily = db_session.query(UsageDaily).one()
+        assert daily.prompt_tokens == 16
+        assert daily.completion_tokens == 26
+        assert daily.requests == 3
+
+    def test_flush_adds_to_existing_rows(self, db_session):
+        """Test that repeated flushes upsert instead of duplicating rows"""
+        meter = UsageMeter()
+        user_id = uuid4()
+        at = datetime(2025, 1, 1, 12, 30)
+
+        meter.record(user_id, "test-model", 10, 20, at=at)
+        meter.flush(db_session)
+        meter.record(user_id, "test-model", 10, 20, at=at)
+        meter.flush(db_session)
+
+        row = db_session.query(Usage).one()
+        assert row.prompt_tokens == 20
+        assert row.completion_tokens == 40
+        assert row.requests == 2
+
+    def test_flush_empty_buffer(self, db_session):
+        """Test that flushing with nothing buffered is a no-op"""
+        assert UsageMeter().flush(db_session) == 0
+
+
+class TestUsageAPI:
+    def test_usage_after_chat(self, client, db_session, test_user_data, test_login_data):
+        """Test that chat usage shows up in the daily rollup"""
+        client.post("/api/v1/auth/register", json=test_user_data)
+        login_response = client.post("/api/v1/auth/login", json=test_login_data)
+        headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+        chat_data = {"messages": [{"role": "user", "content": "Hello there, how are you?"}]}
+        client.post("/api/v1/chat/", json=chat_data, headers=headers)
+        usage_meter.flush(db_session)
+
+        response = client.get("/api/v1/usage", headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+
+        data = response.json()
+        assert len(data["days"]) == 1
+        assert data["days"][0]["requests"] == 1
+        assert data["prompt_tokens"] > 0
+        assert data["total_tokens"] == data["prompt_tokens"] + data["completion_tokens"]
+
+    def test_usage_invalid_token(self, client):
+        """Test usage endpoint with invalid token"""
+        headers = {"Authorization": "Bearer invalid_token"}
+        response = client.get("/api/v1/usage", headers=headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
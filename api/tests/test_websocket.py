@@ -0,0 +1,146 @@
+import pytest
+from fastapi import status
+from starlette.websockets import WebSocketDisconnect
+
+import controllers.websocket as chat_ws
+from providers import FakeProvider, set_provider
+
+
+@pytest.fixture
+def provider():
+    fake = FakeProvider(delay=0.001)
+    set_provider(fake)
+    yield fake
+    set_provider(None)
+
+
+@pytest.fixture
+def token(client, test_user_data, test_login_data):
+    client.post("/api/v1/auth/register", json=test_user_data)
+    login_response = client.post("/api/v1/auth/login", json=test_login_data)
+    return login_response.json()["access_token"]
+
+
+def _collect(ws, until):
+    """Read frames until ``until(frame)`` is true, returning them all"""
+    frames = []
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] == "ping":
+            continue
+        frames.append(frame)
+        if until(frame):
+            return frames
+
+
+class TestChatWebSocket:
+    def test_requires_token(self, client, provider):
+        """Test that the socket is refused without a valid token"""
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect("/api/v1/chat/ws?token=invalid_token"):
+                pass
+        assert exc.value.code == status.WS_1008_POLICY_VIOLATION
+
+    def test_multiplexed_streams(self, client, provider, token):
+        """Test two concurrent generations over one connection"""
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_json({"type": "start", "stream_id": "a", "prompt": "first prompt"})
+            ws.send_json({"type": "start", "stream_id": "b", "prompt": "second prompt"})
+
+            done = set()
+
+            def both_done(frame):
+                if frame["type"] == "done":
+                    done.add(frame["stream_id"])
+                return done == {"a", "b"}
+
+            frames = _collect(ws, both_done)
+
+        text = {
+            stream_id: "".join(f["text"] for f in frames if f["type"] == "delta" and f["stream_id"] == stream_id)
+            for stream_id in ("a", "b")
+        }
+        assert text == {"a": "You said: first prompt", "b": "You said: second prompt"}
+
+    def test_cancel_stream(self, client, provider, token):
+        """Test that a cancel frame stops the generation"""
+        provider.reply = " ".join(["word"] * 500)
+        provider.delay = 0.01
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            ws.receive_json()
+            ws.send_json({"type": "start", "stream_id": "a", "prompt": "long"})
+            _collect(ws, lambda f: f["type"] == "delta")
+            ws.send_json({"type": "cancel", "stream_id": "a"})
+            frames = _collect(ws, lambda f: f["type"] in ("cancelled", "done"))
+
+        assert frames[-1] == {"type": "cancelled", "stream_id": "a"}
+        assert provider.chunks_pulled < 500
+
+    def test_ping_pong_and_errors(self, client, provider, token):
+        """Test keep-alive and invalid frames"""
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            ws.receive_json()
+            ws.send_json({"type": "ping"})
+            assert _collect(ws, lambda f: True) == [{"type": "pong"}]
+
+            ws.send_json({"type": "start", "stream_id": "a", "prompt": ""})
+            assert _collect(ws, lambda f: True)[0]["type"] == "error"
+
+            ws.send_json({"type": "cancel", "stream_id": "missing"})
+            assert _collect(ws, lambda f: True)[0]["detail"] == "Unknown stream"
+
+    def test_malformed_frames_keep_the_connection_open(self, client, provider, token):
+        """Test that binary frames and non-string stream ids are rejected without closing the socket"""
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            ws.receive_json()
+            ws.send_bytes(b"\x00\x01")
+            assert _collect(ws, lambda f: True) == [{"type": "error", "detail": "Binary frames are not supported"}]
+
+            for stream_id in (["a"], {"a": 1}, 1):
+                ws.send_json({"type": "cancel", "stream_id": stream_id})
+                assert _collect(ws, lambda f: True)[0]["detail"] == "stream_id must be a string"
+
+            ws.send_json({"type": "ping"})
+            assert _collect(ws, lambda f: True) == [{"type": "pong"}]
+
+    def test_revoked_session_closes_on_next_start(self, client, provider, token):
+        """Test that a socket opened before logout-all can't start new streams"""
+        headers = {"Authorization": f"Bearer {token}"}
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            ws.receive_json()
+            response = client.post("/api/v1/auth/logout-all", headers=headers)
+            assert response.json()["revoked"] == 1
+            assert client.get("/api/v1/auth/me", headers=headers).status_code == status.HTTP_401_UNAUTHORIZED
+
+            ws.send_json({"type": "start", "stream_id": "a", "prompt": "hello"})
+            with pytest.raises(WebSocketDisconnect) as exc:
+                _collect(ws, lambda f: False)
+        assert exc.value.code == status.WS_1008_POLICY_VIOLATION
+
+    def test_expired_token_closes_on_next_start(self, client, provider, token, monkeypatch):
+        """Test that a socket outliving its access token can't start new streams"""
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            ws.receive_json()
+            monkeypatch.setattr(chat_ws.time, "time", lambda: 2 ** 40)
+            ws.send_json({"type": "start", "stream_id": "a", "prompt": "hello"})
+            with pytest.raises(WebSocketDisconnect) as exc:
+                _collect(ws, lambda f: False)
+        assert exc.value.code == status.WS_1008_POLICY_VIOLATION
+
+    def test_frame_limit_counts_bytes(self, client, provider, token):
+        """Test that the frame size limit applies to UTF-8 bytes, not characters"""
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            ws.receive_json()
+            prompt = "é" * (chat_ws.MAX_FRAME_BYTES // 2)
+            ws.send_json({"type": "start", "stream_id": "a", "prompt": prompt})
+            assert _collect(ws, lambda f: True) == [{"type": "error", "detail": "Frame too large"}]
+
+    def test_idle_timeout(self, client, provider, token, monkeypatch):
+        """Test that idle connections are closed"""
+        monkeypatch.setattr(chat_ws, "IDLE_TIMEOUT", 0.05)
+        with client.websocket_connect(f"/api/v1/chat/ws?token={token}") as ws:
+            ws.receive_json()
+            with pytest.raises(WebSocketDisconnect) as exc:
+                _collect(ws, lambda f: False)
+        assert exc.value.code == 1000
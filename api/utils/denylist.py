@@ -0,0 +1,45 @@
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Tuple
+
+
+class SessionDenylist:
+    """In-memory set of revoked session ids, checked on every token verification.
+
+    Only sessions that are revoked and not yet expired are kept, so the set
+    stays small and a lookup is a single hash probe with no false positives.
+    Entries are added locally on revocation and merged in from the database
+    by ``SessionController.sync``.
+    """
+
+    def __init__(self):
+        self._revoked: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, session_id: str) -> bool:
+        return session_id in self._revoked
+
+    def add(self, entries: Iterable[Tuple[str, datetime]]) -> None:
+        """Add ``(session_id, expires_at)`` pairs"""
+        with self._lock:
+            for session_id, expires_at in entries:
+                self._revoked[str(session_id)] = expires_at
+
+    def prune(self, now: datetime) -> int:
+        """Forget sessions whose tokens have expired anyway"""
+        with self._lock:
+            expired = [sid for sid, expires_at in self._revoked.items() if expires_at <= now]
+            for sid in expired:
+                del self._revoked[sid]
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+
+
+# Global instance consulted by utils.jwt.verify_token
+session_denylist = SessionDenylist()
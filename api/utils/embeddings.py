@@ -0,0 +1,199 @@
+import os
+import re
+import threading
+import zlib
+from typing import List, Optional, Sequence, Tuple
+from uuid import UUID
+
+try:
+    import numpy as np
+except ImportError:  # Semantic search is optional
+    np = None
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+class HashingEmbedder:
+    """Dependency-free text embedder using signed feature hashing.
+
+    Unigrams and bigrams are hashed with CRC32 (stable across processes) into
+    ``dim`` buckets and the result is L2-normalised. Swap in a model-backed
+    embedder with the same ``embed`` signature for better recall.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, texts: Sequence[str]) -> "np.ndarray":
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def _split_uuid(user_id: UUID) -> Tuple[int, int]:
+    value = user_id.int
+    return value >> 64, value & 0xFFFFFFFFFFFFFFFF
+
+
+class EmbeddingIndex:
+    """Brute-force vector index with int8 quantisation.
+
+    Each vector is stored as int8 codes plus one float32 scale, so 1M
+    256-dimensional vectors take ~260MB instead of ~1GB. With ``path`` set
+    the columns live in append-only files that are memory-mapped for search;
+    without it everything stays in memory. Every vector carries its owner's
+    UUID and searches are always restricted to a single owner.
+    """
+
+    FILES = {
+        "codes": ("codes.i8", "int8"),
+        "scales": ("scales.f32", "float32"),
+        "ids": ("ids.i64", "int64"),
+        "owners": ("owners.u64", "uint64"),
+    }
+
+    def __init__(self, dim: int = 256, path: Optional[str] = None):
+        if np is None:
+            raise RuntimeError("numpy is required for semantic search")
+        self.dim = dim
+        self.path = path
+        self._lock = threading.Lock()
+        self._arrays = None
+        # In-memory columns are preallocated and doubled when full, so an add
+        # copies only the new rows and searches see a prefix view
+        self._buffers: Optional[dict] = None
+        self._size = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def _width(self, name: str) -> int:
+        return {"codes": self.dim, "owners": 2}.get(name, 1)
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, self.FILES[name][0])
+
+    def __len__(self) -> int:
+        return len(self._load()["ids"])
+
+    def quantize(self, vectors: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def add(self, ids: Sequence[int], owners: Sequence[UUID], vectors: "np.ndarray") -> None:
+        if len(ids) == 0:
+            return
+        codes, scales = self.quantize(np.asarray(vectors, dtype=np.float32))
+        columns = {
+            "codes": codes,
+            "scales": scales,
+            "ids": np.asarray(ids, dtype=np.int64),
+            "owners": np.array([_split_uuid(owner) for owner in owners], dtype=np.uint64),
+        }
+        with self._lock:
+            if self.path:
+                # ids are written last so a torn append is ignored on reload
+                for name in ("codes", "scales", "owners", "ids"):
+                    with open(self._file(name), "ab") as f:
+                        f.write(np.ascontiguousarray(columns[name]).tobytes())
+                self._arrays = None
+            else:
+                self._append(columns)
+
+    def _append(self, columns: dict) -> None:
+        count = len(columns["ids"])
+        size = self._size + count
+        if self._buffers is None or size > len(self._buffers["ids"]):
+            capacity = max(size, 2 * (len(self._buffers["ids"]) if self._buffers else 0), 1024)
+            buffers = {}
+            for name, (_, dtype) in self.FILES.items():
+                width = self._width(name)
+                buffers[name] = np.empty((capacity, width) if width > 1 else (capacity,), dtype=dtype)
+                if self._size:
+                    buffers[name][:self._size] = self._buffers[name][:self._size]
+            # Views handed out earlier keep the old buffers alive until their searches finish
+            self._buffers = buffers
+        for name in self.FILES:
+            self._buffers[name][self._size:size] = columns[name]
+        self._size = size
+        self._arrays = {name: buffer[:size] for name, buffer in self._buffers.items()}
+
+    def _load(self) -> dict:
+        with self._lock:
+            if self._arrays is not None:
+                return self._arrays
+
+            if self.path:
+                arrays = {}
+                for name, (_, dtype) in self.FILES.items():
+                    file_name = self._file(name)
+                    width = self._width(name)
+                    size = os.path.getsize(file_name) if os.path.exists(file_name) else 0
+                    rows = size // (np.dtype(dtype).itemsize * width)
+                    arrays[name] = (
+                        np.memmap(file_name, dtype=dtype, mode="r", shape=(rows, width) if width > 1 else (rows,))
+                        if rows else np.empty((0, width) if width > 1 else (0,), dtype=dtype)
+                    )
+                count = min(len(a) for a in arrays.values())
+                arrays = {name: a[:count] for name, a in arrays.items()}
+            else:
+                arrays = {
+                    name: np.empty((0, self._width(name)) if self._width(name) > 1 else (0,), dtype=dtype)
+                    for name, (_, dtype) in self.FILES.items()
+                }
+
+            self._arrays = arrays
+            return arrays
+
+    def missing(self, ids: Sequence[int]) -> "np.ndarray":
+        """Return the sorted, distinct ``ids`` that are not in the index"""
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        return ids[~np.isin(ids, self._load()["ids"])]
+
+    def search(
+        self,
+        owner: UUID,
+        query: "np.ndarray",
+        limit: int = 10,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """Return ``(id, score)`` pairs ordered by score desc, id desc.
+
+        ``after`` is the ``(score, id)`` of the last hit on the previous page.
+        """
+        arrays = self._load()
+        hi, lo = _split_uuid(owner)
+        owners = arrays["owners"]
+        rows = np.flatnonzero((owners[:, 0] == hi) & (owners[:, 1] == lo))
+        if len(rows) == 0:
+            return []
+
+        query = np.asarray(query, dtype=np.float32).ravel()
+        scores = (arrays["codes"][rows].astype(np.float32) @ query) * arrays["scales"][rows]
+        ids = arrays["ids"][rows]
+
+        if after is not None:
+            score, last_id = after
+            keep = (scores < score) | ((scores == score) & (ids < last_id))
+            scores, ids = scores[keep], ids[keep]
+
+        if len(scores) > limit:
+            # Keep every tie at the cut-off so keyset pagination never skips rows
+            threshold = np.partition(scores, len(scores) - limit)[len(scores) - limit]
+            keep = scores >= threshold
+            scores, ids = scores[keep], ids[keep]
+
+        order = np.lexsort((-ids, -scores))[:limit]
+        return [(int(ids[i]), float(scores[i])) for i in order]
@@ -1,13 +1,21 @@
+import base64
+import hashlib
+import hmac
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from pydantic import ValidationError
+from sqlalchemy.orm import Session
 
 from schemas.auth import TokenData
+from utils.denylist import session_denylist
+from database import get_db
+from cache import cache_manager
 
 # JWT Settings
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
@@ -15,6 +23,23 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# Stream tickets: short-lived HMAC-signed proofs of login for the Next.js
+# stream proxy. Set the same STREAM_TICKET_SECRET on the frontend to verify
+# them there without calling the API.
+STREAM_TICKET_SECRET = os.getenv("STREAM_TICKET_SECRET") or hmac.new(
+    SECRET_KEY.encode(), b"stream-ticket", hashlib.sha256
+).hexdigest()
+STREAM_TICKET_TTL = int(os.getenv("STREAM_TICKET_TTL", "300"))
+STREAM_TICKET_VERSION = "v1"
+
+# Comma-separated emails allowed to use the /admin endpoints
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+
+# Verified access/refresh tokens; never leaves the worker, so it skips the shared L2
+token_cache = cache_manager.namespace(
+    "tokens", ttl=float(os.getenv("TOKEN_CACHE_TTL", "60")), max_size=50000, shared=False
+)
+
 security = HTTPBearer()
 
 
@@ -38,33 +63,122 @@ def create_refresh_token(data: dict):
     return encoded_jwt
 
 
-def verify_token(token: str, token_type: str = "access") -> TokenData:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
+
+def _decode_token(token: str, token_type: str) -> Tuple[TokenData, int]:
+    """Check the signature and claims; returns the token data and its expiry (unix seconds)"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         
         # Verify token type
         if payload.get("type") != token_type:
-            raise credentials_exception
+            raise _credentials_exception()
         
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
+        session_id: Optional[str] = payload.get("sid")
         
         if user_id is None:
-            raise credentials_exception
+            raise _credentials_exception()
         
-        token_data = TokenData(user_id=UUID(user_id), email=email)
-        return token_data
+        token_data = TokenData(
+            user_id=UUID(user_id),
+            email=email,
+            session_id=UUID(session_id) if session_id else None,
+        )
+        return token_data, int(payload["exp"])
     
-    except (JWTError, ValidationError, ValueError):
-        raise credentials_exception
+    except (JWTError, ValidationError, ValueError, KeyError):
+        raise _credentials_exception()
+
+
+def verify_token_with_expiry(token: str, token_type: str = "access") -> Tuple[TokenData, int]:
+    """Like ``verify_token``, also returning the token's expiry (unix seconds)"""
+    # Decoded tokens are cached per worker; expiry and revocation are still checked on every call
+    token_data, expires_at = token_cache.get_or_load(
+        f"{token_type}:{token}", lambda: _decode_token(token, token_type)
+    )
+    if expires_at <= time.time():
+        raise _credentials_exception()
+
+    # Revoked sessions are checked in memory, without a database round trip
+    if token_data.session_id is not None and session_denylist.is_revoked(str(token_data.session_id)):
+        raise _credentials_exception()
+    return token_data, expires_at
+
+
+def verify_token(token: str, token_type: str = "access") -> TokenData:
+    return verify_token_with_expiry(token, token_type)[0]
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign_ticket(payload: str) -> str:
+    return _b64encode(hmac.new(STREAM_TICKET_SECRET.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def create_stream_ticket(user_id: UUID, session_id: Optional[UUID] = None) -> Tuple[str, int]:
+    """Return a signed ticket ``<payload>.<signature>`` and its expiry (unix seconds).
+
+    The payload is ``v1:<user_id>:<session_id or ->:<exp>``, base64url encoded,
+    so it can be checked with one HMAC and no JSON or database work.
+    """
+    expires_at = int(time.time()) + STREAM_TICKET_TTL
+    raw = f"{STREAM_TICKET_VERSION}:{user_id.hex}:{session_id.hex if session_id else '-'}:{expires_at}"
+    payload = _b64encode(raw.encode())
+    return f"{payload}.{_sign_ticket(payload)}", expires_at
+
+
+def verify_stream_ticket(ticket: str) -> TokenData:
+    invalid_ticket = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid stream ticket",
+    )
+
+    # Tickets are base64url; anything else can't be signed or compared as ASCII
+    if not ticket.isascii():
+        raise invalid_ticket
+    payload, _, signature = ticket.partition(".")
+    if not payload or not hmac.compare_digest(signature.encode(), _sign_ticket(payload).encode()):
+        raise invalid_ticket
+    try:
+        version, user_id, session_id, expires_at = _b64decode(payload).decode().split(":")
+        if version != STREAM_TICKET_VERSION or int(expires_at) < time.time():
+            raise invalid_ticket
+        if session_id != "-" and session_denylist.is_revoked(str(UUID(session_id))):
+            raise invalid_ticket
+        return TokenData(user_id=UUID(user_id), session_id=UUID(session_id) if session_id != "-" else None)
+    except (ValueError, UnicodeDecodeError):
+        raise invalid_ticket
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> TokenData:
     token = credentials.credentials
-    return verify_token(token, "access")
\ No newline at end of file
+    token_data = verify_token(token, "access")
+    # The request shares this session, so the user's reads can follow their own writes
+    db.info["user_id"] = token_data.user_id
+    return token_data
+
+
+def require_admin(current_user: TokenData = Depends(get_current_user)) -> TokenData:
+    if not current_user.email or current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
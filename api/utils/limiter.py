@@ -0,0 +1,132 @@
+import os
+from collections import Counter
+from enum import IntEnum
+from typing import Dict, Optional
+
+
+class Priority(IntEnum):
+    CRITICAL = 0
+    HIGH = 1
+    NORMAL = 2
+    LOW = 3
+
+
+# Fraction of the current limit each class may fill before it is shed.
+# CRITICAL (health probes) is never shed; LOW gives way first.
+DEFAULT_SHARES: Dict[Priority, Optional[float]] = {
+    Priority.CRITICAL: None,
+    Priority.HIGH: 1.0,
+    Priority.NORMAL: 0.9,
+    Priority.LOW: 0.7,
+}
+
+
+class AIMDLimit:
+    """Additive-increase/multiplicative-decrease concurrency limit driven by latency.
+
+    Every completed request is a sample keyed by route and compared with
+    that route's baseline, a slow moving average of its latency. The ratios
+    are smoothed across routes. Once the smoothed ratio exceeds
+    ``tolerance``, or a request fails, the limit shrinks by ``backoff``. It
+    shrinks at most once per round trip: samples that started before the
+    last decrease were admitted under the old limit and are ignored.
+    Otherwise, while at least half the limit is in use, the limit grows by
+    about one per round trip. ``slack`` seconds are added to every baseline
+    so jitter on very fast routes does not count as congestion.
+
+    Times are plain floats so the simulation harness can drive it with a
+    virtual clock.
+    """
+
+    def __init__(
+        self,
+        initial: int = 64,
+        min_limit: int = 8,
+        max_limit: int = 1000,
+        backoff: float = 0.9,
+        tolerance: float = 2.0,
+        slack: float = 0.005,
+        baseline_smoothing: float = 0.01,
+        ratio_smoothing: float = 0.1,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.slack = slack
+        self.baseline_smoothing = baseline_smoothing
+        self.ratio_smoothing = ratio_smoothing
+        self.baselines: Dict[str, float] = {}
+        self.ratio = 1.0
+        self._limit = float(min(max_limit, max(min_limit, initial)))
+        self._last_decrease = float("-inf")
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def update(self, key: str, start: float, end: float, inflight: int, dropped: bool = False) -> int:
+        latency = end - start
+        baseline = self.baselines.get(key, latency)
+        # The baseline moves slowly, so a burst of queueing shows up in the ratio before it is absorbed
+        self.baselines[key] = baseline + (latency - baseline) * self.baseline_smoothing
+        self.ratio += (latency / (baseline + self.slack) - self.ratio) * self.ratio_smoothing
+
+        if dropped or self.ratio > self.tolerance:
+            if start >= self._last_decrease:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_decrease = end
+        elif inflight * 2 >= self._limit:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+        return self.limit
+
+
+class ConcurrencyLimiter:
+    """Admits requests while in-flight work is under their class's share of the limit.
+
+    Only touched from the event loop, so no locking.
+    """
+
+    def __init__(self, limit: AIMDLimit, shares: Optional[Dict[Priority, Optional[float]]] = None):
+        self.limit = limit
+        self.shares = {**DEFAULT_SHARES, **(shares or {})}
+        self.inflight = 0
+        self.admitted: Counter = Counter()
+        self.shed: Counter = Counter()
+
+    def try_acquire(self, priority: Priority) -> bool:
+        share = self.shares[priority]
+        if share is not None and self.inflight >= self.limit.limit * share:
+            self.shed[priority] += 1
+            return False
+        self.inflight += 1
+        self.admitted[priority] += 1
+        return True
+
+    def release(self, key: str, start: float, end: float, dropped: bool = False, sample: bool = True) -> None:
+        """Free a slot; ``sample=False`` frees it without feeding the limit"""
+        if sample:
+            self.limit.update(key, start, end, self.inflight, dropped)
+        self.inflight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit.limit,
+            "inflight": self.inflight,
+            "admitted": {p.name.lower(): self.admitted[p] for p in Priority},
+            "shed": {p.name.lower(): self.shed[p] for p in Priority},
+        }
+
+
+def limiter_from_env() -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(AIMDLimit(
+        initial=int(os.getenv("CONCURRENCY_LIMIT_INITIAL", "64")),
+        min_limit=int(os.getenv("CONCURRENCY_LIMIT_MIN", "8")),
+        max_limit=int(os.getenv("CONCURRENCY_LIMIT_MAX", "1000")),
+        backoff=float(os.getenv("CONCURRENCY_LIMIT_BACKOFF", "0.9")),
+        tolerance=float(os.getenv("CONCURRENCY_LATENCY_TOLERANCE", "2.0")),
+    ))
+
+
+# Global instance shared by the middleware and any stats endpoint
+concurrency_limiter = limiter_from_env()
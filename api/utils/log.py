@@ -0,0 +1,216 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+trace_id_var: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+REDACTED = "[REDACTED]"
+SENSITIVE_KEYS = {
+    "password", "hashed_password", "token", "access_token", "refresh_token",
+    "authorization", "secret", "secret_key", "api_key", "prompt", "messages",
+}
+SENSITIVE_PATTERNS = [
+    (re.compile(r"(?i)\bbearer\s+[\w\-.~+/]+=*"), "Bearer " + REDACTED),
+    (re.compile(r"\beyJ[\w-]+\.[\w-]+\.[\w-]+"), REDACTED),  # JWTs
+    (re.compile(r"(?i)\b(password|token|secret|api_key)=([^\s&]+)"), r"\1=" + REDACTED),
+]
+# Cheap pre-check so most strings skip the patterns above entirely
+_MAY_CONTAIN_SECRET = re.compile(r"(?i)eyJ|bearer|=")
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+def redact(value):
+    """Return ``value`` with sensitive keys and token-looking strings masked"""
+    if isinstance(value, dict):
+        return {k: REDACTED if str(k).lower() in SENSITIVE_KEYS else redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, str) and _MAY_CONTAIN_SECRET.search(value):
+        for pattern, replacement in SENSITIVE_PATTERNS:
+            value = pattern.sub(replacement, value)
+    return value
+
+
+class ContextFilter(logging.Filter):
+    """Stamp request/trace ids onto records while still on the caller's context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.trace_id = trace_id_var.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra=`` fields inlined and redacted"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": redact(record.getMessage()),
+        }
+        for key, value in vars(record).items():
+            if key in _RECORD_ATTRS or value is None:
+                continue
+            if key in ("request_id", "trace_id"):
+                entry[key] = value
+            else:
+                entry[key] = REDACTED if key.lower() in SENSITIVE_KEYS else redact(value)
+        if record.exc_info:
+            entry["exc_info"] = redact(self.formatException(record.exc_info))
+        if orjson is not None:
+            return orjson.dumps(entry, default=str).decode()
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread without blocking the event loop.
+
+    Formatting happens on the listener thread, not here. When the queue
+    holds ``max_size`` records the new one is dropped and counted rather
+    than stalling the caller.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, max_size: int = 10000):
+        super().__init__(log_queue)
+        self.max_size = max_size
+        self.dropped = 0
+        self.addFilter(ContextFilter())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class BatchingQueueListener(QueueListener):
+    """Queue listener that formats whatever has queued up and writes it in one call.
+
+    The stock listener writes and flushes per record, which costs a syscall
+    and a thread wake-up per log line under load. Records are written at
+    most ``flush_interval`` seconds after they are logged.
+    """
+
+    def __init__(
+        self,
+        log_queue: queue.SimpleQueue,
+        handler: logging.StreamHandler,
+        batch_size: int = 512,
+        flush_interval: float = 0.05,
+    ):
+        super().__init__(log_queue, handler)
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def _monitor(self) -> None:
+        log_queue = self.queue
+        stream = self.handler.stream
+        formatter = self.handler.formatter
+        stopping = False
+        while not stopping:
+            batch = [log_queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(log_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for record in batch:
+                if record is self._sentinel:
+                    stopping = True
+                    continue
+                try:
+                    lines.append(formatter.format(record))
+                except Exception:
+                    self.handler.handleError(record)
+            if lines:
+                try:
+                    stream.write("\n".join(lines) + "\n")
+                    stream.flush()
+                except Exception:
+                    pass
+            if not stopping and len(batch) < self.batch_size:
+                # Let records accumulate instead of waking up (and taking
+                # the GIL from the event loop) for every single one
+                time.sleep(self.flush_interval)
+
+
+def setup_logging(
+    level: Optional[str] = None,
+    stream=None,
+    queue_size: Optional[int] = None,
+) -> NonBlockingQueueHandler:
+    """Route all logging through a bounded queue drained by a background thread.
+
+    Safe to call more than once; later calls return the existing handler.
+    """
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+
+    log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JSONFormatter())
+
+    _queue_handler = NonBlockingQueueHandler(log_queue, queue_size or int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    _listener = BatchingQueueListener(log_queue, output)
+    _listener.start()
+
+    # Skip per-record caller/thread/process lookups (see "Optimization" in the logging docs)
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+
+    # uvicorn installs its own synchronous handlers; send everything through ours
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # Request logging middleware replaces uvicorn's unsampled access log
+    logging.getLogger("uvicorn.access").disabled = True
+
+    atexit.register(shutdown_logging)
+    return _queue_handler
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and stop the listener thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
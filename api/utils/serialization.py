@@ -0,0 +1,53 @@
+from typing import Any, Dict, List, Mapping, Optional
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+from schemas.auth import SessionResponse, StreamTicket, StreamTicketVerifyResponse, Token, UserResponse
+from schemas.admin import ImportResult
+from schemas.chat import ChatResponse, StreamResponse
+from schemas.prompts import PromptCacheStats, PromptInfo
+from schemas.search import SearchResponse
+from schemas.usage import UsageSummary
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Default for routes that return plain dicts
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+# Adapters built once at import instead of on first use per worker
+ADAPTERS: Dict[Any, TypeAdapter] = {
+    model: TypeAdapter(model)
+    for model in (
+        Token, UserResponse, List[SessionResponse], StreamTicket, StreamTicketVerifyResponse,
+        ChatResponse, StreamResponse,
+        SearchResponse, UsageSummary, ImportResult, List[PromptInfo], PromptCacheStats,
+    )
+}
+
+
+def get_adapter(model: Any) -> TypeAdapter:
+    adapter = ADAPTERS.get(model)
+    if adapter is None:
+        adapter = ADAPTERS[model] = TypeAdapter(model)
+    return adapter
+
+
+def json_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+    model: Optional[Any] = None,
+) -> Response:
+    """Serialize an already-validated response model straight to JSON bytes.
+
+    Returning a ``Response`` from a route skips FastAPI's ``response_model``
+    pass, which would otherwise dump the model, validate it again and then
+    encode it. Keep ``response_model=`` on the route for the OpenAPI schema.
+    Pass ``model`` for content that isn't a model instance, e.g. a list.
+    """
+    body = get_adapter(model or type(content)).dump_json(content)
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
@@ -0,0 +1,12 @@
+from typing import Iterable
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for usage accounting"""
+    if not text:
+        return 0
+    return max(1, (len(text) + 3) // 4)
+
+
+def estimate_tokens_many(texts: Iterable[str]) -> int:
+    return sum(estimate_tokens(text) for text in texts)
@@ -1,8 +1,51 @@
 import { streamText } from "ai";
 import { google } from "@ai-sdk/google";
+import { cookies } from "next/headers";
+import {
+  STREAM_TICKET_COOKIE,
+  issueStreamTicket,
+  verifyStreamTicketLocally,
+  verifyStreamTicketRemotely,
+} from "@/lib/streamTicket";
+
+/**
+ * Authorize the request with a backend-issued stream ticket.
+ *
+ * A valid ticket cookie is checked locally (one HMAC, no API call). Without
+ * one, the access token cookie is exchanged for a new ticket, which is then
+ * reused for the ticket's lifetime. Returns the Set-Cookie header to send
+ * when a new ticket was issued, or null when the request is not authorized.
+ */
+async function authorize(): Promise<{ setCookie?: string } | null> {
+  const cookieStore = await cookies();
+  const ticket = cookieStore.get(STREAM_TICKET_COOKIE)?.value;
+
+  if (ticket) {
+    const local = verifyStreamTicketLocally(ticket);
+    const claims = local === undefined ? await verifyStreamTicketRemotely(ticket) : local;
+    if (claims) return {};
+  }
+
+  const accessToken = cookieStore.get("auth_token")?.value;
+  if (!accessToken) return null;
+
+  const issued = await issueStreamTicket(accessToken);
+  if (!issued) return null;
+  return {
+    setCookie: `${STREAM_TICKET_COOKIE}=${issued.ticket}; Path=/api/stream; Max-Age=${issued.expires_in}; HttpOnly; SameSite=Strict${process.env.NODE_ENV === "production" ? "; Secure" : ""}`,
+  };
+}
 
 export async function POST(req: Request) {
   try { 
+    const auth = await authorize();
+    if (!auth) {
+      return Response.json(
+        { error: "Please log in to use the chat." },
+        { status: 401 }
+      );
+    }
+
     const body = await req.json();
     const { prompt } = body;
 
@@ -26,7 +69,9 @@ export async function POST(req: Request) {
     });
 
 
-    return result.toUIMessageStreamResponse();
+    return result.toUIMessageStreamResponse(
+      auth.setCookie ? { headers: { "Set-Cookie": auth.setCookie } } : undefined
+    );
   } catch (error) {
     console.error("Error streaming text:", error);
     
@@ -0,0 +1,69 @@
+import { createHmac, timingSafeEqual } from 'crypto';
+
+// Mirrors create_stream_ticket / verify_stream_ticket in api/utils/jwt.py.
+// A ticket is `<base64url payload>.<base64url HMAC-SHA256(payload)>` where
+// the payload is `v1:<user_id>:<session_id or ->:<exp unix seconds>`.
+
+export const STREAM_TICKET_COOKIE = 'stream_ticket';
+
+const API_URL = process.env.API_URL || process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8080';
+
+export interface StreamTicketClaims {
+  userId: string;
+  sessionId: string | null;
+  expiresAt: number;
+}
+
+export interface IssuedStreamTicket {
+  ticket: string;
+  expires_at: number;
+  expires_in: number;
+}
+
+/**
+ * Verify a ticket locally with STREAM_TICKET_SECRET (no network call).
+ * Returns null when the ticket is invalid or expired, and undefined when
+ * no secret is configured so the caller can fall back to the API.
+ */
+export function verifyStreamTicketLocally(ticket: string): StreamTicketClaims | null | undefined {
+  const secret = process.env.STREAM_TICKET_SECRET;
+  if (!secret) return undefined;
+
+  const [payload, signature, extra] = ticket.split('.');
+  if (!payload || !signature || extra !== undefined) return null;
+
+  const expected = createHmac('sha256', secret).update(payload).digest();
+  const given = Buffer.from(signature, 'base64url');
+  if (given.length !== expected.length || !timingSafeEqual(given, expected)) return null;
+
+  const [version, userId, sessionId, exp] = Buffer.from(payload, 'base64url').toString('utf8').split(':');
+  const expiresAt = Number(exp);
+  if (version !== 'v1' || !userId || !Number.isFinite(expiresAt) || expiresAt * 1000 < Date.now()) return null;
+
+  return { userId, sessionId: sessionId === '-' ? null : sessionId, expiresAt };
+}
+
+/** Verify a ticket with the API, which also rejects tickets of revoked sessions */
+export async function verifyStreamTicketRemotely(ticket: string): Promise<StreamTicketClaims | null> {
+  const response = await fetch(`${API_URL}/api/v1/auth/stream-ticket/verify`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ tickets: [ticket] }),
+  });
+  if (!response.ok) return null;
+
+  const { results } = await response.json();
+  const [result] = results;
+  if (!result?.valid) return null;
+  return { userId: result.user_id, sessionId: result.session_id, expiresAt: 0 };
+}
+
+/** Exchange the user's access token for a new ticket (one API call per ticket lifetime) */
+export async function issueStreamTicket(accessToken: string): Promise<IssuedStreamTicket | null> {
+  const response = await fetch(`${API_URL}/api/v1/auth/stream-ticket`, {
+    method: 'POST',
+    headers: { Authorization: `Bearer ${accessToken}` },
+  });
+  if (!response.ok) return null;
+  return response.json();
+}